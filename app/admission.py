@@ -0,0 +1,79 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Callable, Dict, Any, TypeVar
+
+T = TypeVar('T')
+
+# In-flight requests at which analysis falls back to the cheap heuristic path
+DEGRADE_IN_FLIGHT = int(os.getenv('DEGRADE_IN_FLIGHT', '32'))
+# In-flight requests at which new requests are rejected outright
+REJECT_IN_FLIGHT = int(os.getenv('REJECT_IN_FLIGHT', '256'))
+# Smoothed worker queueing delay (seconds) that also triggers degradation
+DEGRADE_QUEUE_DELAY = float(os.getenv('DEGRADE_QUEUE_DELAY', '0.1'))
+
+EWMA_ALPHA = 0.2
+
+class Overloaded(Exception):
+    """Raised when a request is shed instead of admitted"""
+
+class AdmissionController:
+    """Load-aware gate in front of the analysis worker pool
+
+    Requests run on the event loop's default executor. Above the degrade
+    thresholds they are told to take the degraded path; above the reject
+    threshold they are refused.
+    """
+
+    def __init__(self, degrade_in_flight: int = DEGRADE_IN_FLIGHT,
+                 reject_in_flight: int = REJECT_IN_FLIGHT,
+                 degrade_queue_delay: float = DEGRADE_QUEUE_DELAY):
+        self.degrade_in_flight = degrade_in_flight
+        self.reject_in_flight = reject_in_flight
+        self.degrade_queue_delay = degrade_queue_delay
+        self.in_flight = 0
+        self.queue_delay = 0.0
+        self.admitted = 0
+        self.degraded = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def _observe_queue_delay(self, delay: float):
+        with self._lock:
+            self.queue_delay += EWMA_ALPHA * (delay - self.queue_delay)
+
+    def should_degrade(self) -> bool:
+        return self.in_flight >= self.degrade_in_flight or self.queue_delay >= self.degrade_queue_delay
+
+    async def run(self, fn: Callable[[bool], T]) -> T:
+        """Run fn(degraded) in a worker thread, or raise Overloaded"""
+        if self.in_flight >= self.reject_in_flight:
+            self.rejected += 1
+            raise Overloaded()
+
+        degraded = self.should_degrade()
+        self.admitted += 1
+        if degraded:
+            self.degraded += 1
+
+        submitted = time.monotonic()
+
+        def call() -> T:
+            self._observe_queue_delay(time.monotonic() - submitted)
+            return fn(degraded)
+
+        self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(None, call)
+        finally:
+            self.in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "queue_delay_ms": round(self.queue_delay * 1000, 2),
+            "admitted": self.admitted,
+            "degraded": self.degraded,
+            "rejected": self.rejected,
+        }
@@ -1,54 +1,199 @@
-import re
 import os
-import joblib
-import numpy as np
+import pickle
+import re
+import tempfile
 from typing import Dict, List, Tuple, Any, Optional
 import phonenumbers
-from phonenumbers import geocoder, carrier
 import validators
-from app.db import check_blacklist, get_training_data
+from app.db import check_blacklist, get_training_data, add_training_data
+from app.scorer import ModelBundle, SCORER_PATH
+from app.minhash import MinHashIndex, normalize_sms
+from app.domains import BrandIndex
+from app.indicators import normalize_indicator
+from app.velocity import VelocityTracker, VELOCITY_PATH
+from app.phone_prefixes import PhonePrefixTable, PREFIX_TABLE_PATH
+
+SCAM_LABELS = ('scam', 'likely_scam')
+SMS_TEMPLATE_LIMIT = 10000
+INPUT_TYPES = ('phone', 'url', 'sms', 'file')
+
+# SMS keyword lists (matched as substrings of the lowercased text)
+URGENCY_KEYWORDS = ['urgent', 'immediately', 'now', 'hurry', 'limited time', 'expire', 'act now']
+MONEY_KEYWORDS = ['loan', 'credit', 'money', 'cash', 'prize', 'won', 'winner', 'claim', 'reward']
+# Suspicious keywords specific to Indian scams
+SUSPICIOUS_KEYWORDS = ['rummy', 'betting', 'casino', 'lottery', 'verify account', 'suspended', 'confirm']
+
+SMS_URL_PATTERN = re.compile(r'http[s]?://|www\.')
+SMS_PHONE_PATTERN = re.compile(r'\+?\d{10,}')
 
-MODEL_PATH = "app/scam_model.pkl"
+# Lookups per hour above which an indicator is treated as part of a scam wave
+VELOCITY_THRESHOLD = 500
+
+# Serialized model and indexes a new replica loads instead of rebuilding
+WARM_STATE_PATH = os.getenv('WARM_STATE_PATH', 'app/warm_state.pkl')
+WARM_STATE_VERSION = 4
+
+def _artifact_stamp(path: str) -> Optional[Tuple[int, int]]:
+    """Modification time and size identifying an artifact on disk"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+def _sms_watermark() -> Optional[Tuple[Any, int]]:
+    """(created_at, id) of the newest SMS training row"""
+    rows = get_training_data('sms', limit=1)
+    return (rows[0]['created_at'], rows[0]['id']) if rows else None
 
 class ScamAnalyzer:
-    def __init__(self):
-        self.model = self._load_model()
-        
-    def _load_model(self):
-        """Load or create ML model"""
-        if os.path.exists(MODEL_PATH):
+    def __init__(self, warm_state: Optional[Dict[str, Any]] = None):
+        self.warm = warm_state is not None
+        if warm_state is not None:
+            self.model = warm_state['model']
+            self.sms_index = warm_state['sms_index']
+            self.sms_watermark = warm_state['sms_watermark']
+        else:
+            self.model = self._load_model()
+            self.sms_watermark = _sms_watermark()
+            self.sms_index = self._build_sms_index()
+        # Built fresh (about a millisecond) so brand list changes apply on deploy
+        self.brand_index = BrandIndex()
+        self.velocity = VelocityTracker.load(VELOCITY_PATH)
+        self.prefix_table = PhonePrefixTable.load(PREFIX_TABLE_PATH)
+    
+    @classmethod
+    def load_warm(cls, path: str = WARM_STATE_PATH) -> "ScamAnalyzer":
+        """Restore from a warm-state snapshot, building from scratch if it is stale"""
+        state = None
+        if os.path.exists(path):
             try:
-                return joblib.load(MODEL_PATH)
-            except:
-                return None
-        return None
+                with open(path, 'rb') as f:
+                    state = pickle.load(f)
+            except Exception as e:
+                print(f"Ignoring unreadable warm state: {e}")
+        
+        if not state or state.get('version') != WARM_STATE_VERSION or state.get('sms_watermark') != _sms_watermark():
+            return cls()
+        
+        # A retrained bundle on disk replaces the snapshotted one
+        if state.get('model_stamp') != _artifact_stamp(SCORER_PATH):
+            state['model'] = ModelBundle.load(SCORER_PATH)
+        return cls(state)
+    
+    def save_warm(self, path: str = WARM_STATE_PATH):
+        """Snapshot model and indexes so the next start can skip rebuilding them"""
+        state = {
+            'version': WARM_STATE_VERSION,
+            'model': self.model,
+            'model_stamp': _artifact_stamp(SCORER_PATH),
+            'sms_index': self.sms_index,
+            'sms_watermark': self.sms_watermark,
+        }
+        # Unique temp name: the background provisioner and shutdown may overlap
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        
+    def _load_model(self) -> Optional[ModelBundle]:
+        """Load exported per input type model bundle if available"""
+        return ModelBundle.load(SCORER_PATH)
     
-    def analyze(self, input_type: str, input_value: str, mode: str = "balanced") -> Dict[str, Any]:
-        """Main analysis function"""
+    def _build_sms_index(self) -> MinHashIndex:
+        """Index known scam SMS templates from labelled training data"""
+        index = MinHashIndex()
+        for row in get_training_data('sms', limit=SMS_TEMPLATE_LIMIT):
+            if row.get('label') in SCAM_LABELS:
+                index.insert(normalize_sms(row['input_raw']), row['input_raw'])
+        return index
+    
+    def add_sms_template(self, sms: str, label: str = "scam"):
+        """Store a labelled SMS and index it if it is a scam template"""
+        features = self._extract_sms_features(sms)
+        features.pop('raw', None)
+        add_training_data('sms', sms, label, features)
+        
+        if label in SCAM_LABELS:
+            self.sms_index.insert(normalize_sms(sms), sms)
+    
+    def analyze(self, input_type: str, input_value: str, mode: str = "balanced", degraded: bool = False) -> Dict[str, Any]:
+        """Main analysis function
+        
+        When degraded, only in-memory heuristics run: no blacklist round-trip
+        to the database and no ML scoring.
+        """
+        if input_type not in INPUT_TYPES:
+            raise ValueError(f"Unknown input type: {input_type}")
+        
+        if degraded:
+            mode = "heuristic"
+        use_lookup = not degraded
+        
+        lookups = self.record_lookup(input_type, input_value)
+        
         if input_type == "phone":
-            return self._analyze_phone(input_value, mode)
+            result = self._analyze_phone(input_value, mode, lookups, use_lookup)
         elif input_type == "url":
-            return self._analyze_url(input_value, mode)
+            result = self._analyze_url(input_value, mode, lookups, use_lookup)
         elif input_type == "sms":
-            return self._analyze_sms(input_value, mode)
-        elif input_type == "file":
-            return self._analyze_file(input_value, mode)
+            result = self._analyze_sms(input_value, mode, lookups, use_lookup)
         else:
-            raise ValueError(f"Unknown input type: {input_type}")
+            result = self._analyze_file(input_value, mode, lookups, use_lookup)
+        
+        if degraded:
+            self._mark_degraded(result)
+        return result
+    
+    def _mark_degraded(self, result: Dict[str, Any]):
+        """Flag a result produced by the reduced analysis path"""
+        result["degraded"] = True
+        result["explain"].append("Server under high load - fast heuristic check only (blacklist and ML skipped)")
+    
+    def record_lookup(self, input_type: str, input_value: str) -> int:
+        """Count a lookup of the indicator and return its hourly volume"""
+        return self.velocity.record(f"{input_type}:{normalize_indicator(input_type, input_value)}")
     
-    def _analyze_phone(self, phone: str, mode: str) -> Dict[str, Any]:
+    def analyze_upload(self, filename: str, hashes: Dict[str, str], apk_info: Optional[Dict[str, Any]], mode: str = "balanced", degraded: bool = False) -> Dict[str, Any]:
+        """Analyze an uploaded file from its digests and APK metadata"""
+        if degraded:
+            mode = "heuristic"
+        
+        features = self._extract_upload_features(filename, hashes, apk_info, not degraded)
+        if 'sha256' in hashes:
+            features['lookups_last_hour'] = self.record_lookup('file', hashes['sha256'])
+        heuristic_score, heuristic_reasons = self._file_heuristics(filename, features)
+        
+        used_methods = ["heuristic"]
+        ml_score, ml_reasons = self._ml_score("file", features, mode, used_methods)
+        
+        if features.get('in_blacklist'):
+            used_methods.append("lookup")
+        
+        final_score = self._fuse_scores(heuristic_score, ml_score, mode, features)
+        label = self._score_to_label(final_score)
+        
+        result = {
+            "label": label,
+            "confidence": round(final_score, 2),
+            "explain": heuristic_reasons + ml_reasons,
+            "used_methods": used_methods,
+            "hashes": hashes,
+            "apk": apk_info
+        }
+        
+        if degraded:
+            self._mark_degraded(result)
+        return result
+    
+    def _analyze_phone(self, phone: str, mode: str, lookups: int = 0, use_lookup: bool = True) -> Dict[str, Any]:
         """Analyze phone number for scam indicators"""
-        features = self._extract_phone_features(phone)
+        features = self._extract_phone_features(phone, use_lookup)
+        features['lookups_last_hour'] = lookups
         heuristic_score, heuristic_reasons = self._phone_heuristics(phone, features)
         
-        ml_score = 0.5
-        ml_reasons = []
         used_methods = ["heuristic"]
-        
-        if self.model is not None and mode in ["ml", "balanced", "hybrid"]:
-            ml_score = self._ml_predict(features)
-            ml_reasons.append(f"ML model prediction: {ml_score:.2f}")
-            used_methods.append("ml")
+        ml_score, ml_reasons = self._ml_score("phone", features, mode, used_methods)
         
         if features.get('in_blacklist'):
             used_methods.append("lookup")
@@ -66,13 +211,14 @@ class ScamAnalyzer:
             "used_methods": used_methods
         }
     
-    def _analyze_url(self, url: str, mode: str) -> Dict[str, Any]:
+    def _analyze_url(self, url: str, mode: str, lookups: int = 0, use_lookup: bool = True) -> Dict[str, Any]:
         """Analyze URL for scam indicators"""
-        features = self._extract_url_features(url)
+        features = self._extract_url_features(url, use_lookup)
+        features['lookups_last_hour'] = lookups
         heuristic_score, heuristic_reasons = self._url_heuristics(url, features)
         
-        ml_score = 0.5
         used_methods = ["heuristic"]
+        ml_score, ml_reasons = self._ml_score("url", features, mode, used_methods)
         
         if features.get('in_blacklist'):
             used_methods.append("lookup")
@@ -83,33 +229,41 @@ class ScamAnalyzer:
         return {
             "label": label,
             "confidence": round(final_score, 2),
-            "explain": heuristic_reasons,
+            "explain": heuristic_reasons + ml_reasons,
             "used_methods": used_methods
         }
     
-    def _analyze_sms(self, sms: str, mode: str) -> Dict[str, Any]:
+    def _analyze_sms(self, sms: str, mode: str, lookups: int = 0, use_lookup: bool = True) -> Dict[str, Any]:
         """Analyze SMS text for scam indicators"""
         features = self._extract_sms_features(sms)
-        heuristic_score, heuristic_reasons = self._sms_heuristics(sms, features)
+        features['lookups_last_hour'] = lookups
+        return self.score_sms_features(features, mode)
+    
+    def score_sms_features(self, features: Dict[str, Any], mode: str = "balanced") -> Dict[str, Any]:
+        """Score already extracted SMS features"""
+        heuristic_score, heuristic_reasons = self._sms_heuristics(features.get('raw', ''), features)
+        
+        used_methods = ["heuristic"]
+        ml_score, ml_reasons = self._ml_score("sms", features, mode, used_methods)
         
-        ml_score = 0.5
         final_score = self._fuse_scores(heuristic_score, ml_score, mode, features)
         label = self._score_to_label(final_score)
         
         return {
             "label": label,
             "confidence": round(final_score, 2),
-            "explain": heuristic_reasons,
-            "used_methods": ["heuristic"]
+            "explain": heuristic_reasons + ml_reasons,
+            "used_methods": used_methods
         }
     
-    def _analyze_file(self, file_hash: str, mode: str) -> Dict[str, Any]:
+    def _analyze_file(self, file_hash: str, mode: str, lookups: int = 0, use_lookup: bool = True) -> Dict[str, Any]:
         """Analyze file hash for scam indicators"""
-        features = self._extract_file_features(file_hash)
+        features = self._extract_file_features(file_hash, use_lookup)
+        features['lookups_last_hour'] = lookups
         heuristic_score, heuristic_reasons = self._file_heuristics(file_hash, features)
         
-        ml_score = 0.5
         used_methods = ["heuristic"]
+        ml_score, ml_reasons = self._ml_score("file", features, mode, used_methods)
         
         if features.get('in_blacklist'):
             used_methods.append("lookup")
@@ -120,11 +274,11 @@ class ScamAnalyzer:
         return {
             "label": label,
             "confidence": round(final_score, 2),
-            "explain": heuristic_reasons,
+            "explain": heuristic_reasons + ml_reasons,
             "used_methods": used_methods
         }
     
-    def _extract_phone_features(self, phone: str) -> Dict[str, Any]:
+    def _extract_phone_features(self, phone: str, use_lookup: bool = True) -> Dict[str, Any]:
         """Extract features from phone number"""
         features = {
             'raw': phone,
@@ -133,30 +287,43 @@ class ScamAnalyzer:
             'in_blacklist': False,
             'blacklist_trust': 0.0,
             'is_premium': False,
+            'is_toll_free': False,
             'is_shortcode': False,
             'has_suspicious_pattern': False,
             'country_code': '',
             'area_code': '',
+            'region': '',
+            'carrier': '',
+            'line_type': '',
             'repeated_digits': 0
         }
         
         # Check blacklist
-        bl_result = check_blacklist('phone', phone)
+        bl_result = check_blacklist('phone', phone) if use_lookup else None
         if bl_result:
             features['in_blacklist'] = True
             features['blacklist_trust'] = bl_result.get('trust_score', 0.8)
         
+        clean_phone = re.sub(r'[^0-9]', '', phone)
+        # Only a parsed number has a known country code to look up by
+        international = None
+        
         # Parse phone number
         try:
             parsed = phonenumbers.parse(phone, None)
             features['country_code'] = str(parsed.country_code)
             features['is_valid'] = phonenumbers.is_valid_number(parsed)
+            international = str(parsed.country_code) + phonenumbers.national_significant_number(parsed)
         except:
             features['is_valid'] = False
         
-        # Check for premium numbers (900, 1900 prefixes)
-        clean_phone = re.sub(r'[^0-9]', '', phone)
-        if clean_phone.startswith('900') or clean_phone.startswith('1900'):
+        # Region, carrier and line type from the precomputed prefix table
+        if self.prefix_table is not None and international:
+            features.update(self.prefix_table.lookup(international))
+            features['is_premium'] = features['line_type'] == 'premium_rate'
+            features['is_toll_free'] = features['line_type'] == 'toll_free'
+        elif clean_phone.startswith('900') or clean_phone.startswith('1900'):
+            # Unparsed national format or table not built yet, only the NANP premium range is known
             features['is_premium'] = True
         
         # Check for shortcode (very short numbers)
@@ -172,7 +339,7 @@ class ScamAnalyzer:
         
         return features
     
-    def _extract_url_features(self, url: str) -> Dict[str, Any]:
+    def _extract_url_features(self, url: str, use_lookup: bool = True) -> Dict[str, Any]:
         """Extract features from URL"""
         features = {
             'raw': url,
@@ -184,11 +351,15 @@ class ScamAnalyzer:
             'has_suspicious_tld': False,
             'is_https': url.startswith('https://'),
             'subdomain_count': 0,
-            'has_shortener': False
+            'has_shortener': False,
+            'is_lookalike': False,
+            'lookalike_brand': '',
+            'brand_distance': 0,
+            'lookalike_homoglyph': False
         }
         
         # Check blacklist
-        bl_result = check_blacklist('url', url)
+        bl_result = check_blacklist('url', url) if use_lookup else None
         if bl_result:
             features['in_blacklist'] = True
             features['blacklist_trust'] = bl_result.get('trust_score', 0.8)
@@ -210,6 +381,14 @@ class ScamAnalyzer:
             domain_part = url.split('://')[1].split('/')[0]
             features['subdomain_count'] = domain_part.count('.')
         
+        # Typosquat / homoglyph match against protected brands
+        lookalike = self.brand_index.match(url)
+        if lookalike:
+            features['is_lookalike'] = True
+            features['lookalike_brand'] = lookalike['brand']
+            features['brand_distance'] = lookalike['distance']
+            features['lookalike_homoglyph'] = lookalike['homoglyph']
+        
         return features
     
     def _extract_sms_features(self, sms: str) -> Dict[str, Any]:
@@ -217,30 +396,32 @@ class ScamAnalyzer:
         features = {
             'raw': sms,
             'length': len(sms),
-            'has_url': bool(re.search(r'http[s]?://|www\.', sms)),
-            'has_phone': bool(re.search(r'\+?\d{10,}', sms)),
+            'has_url': bool(SMS_URL_PATTERN.search(sms)),
+            'has_phone': bool(SMS_PHONE_PATTERN.search(sms)),
             'urgency_words': 0,
             'money_words': 0,
-            'has_suspicious_keywords': False
+            'has_suspicious_keywords': False,
+            'template_similarity': 0.0
         }
         
         sms_lower = sms.lower()
         
         # Urgency indicators
-        urgency_keywords = ['urgent', 'immediately', 'now', 'hurry', 'limited time', 'expire', 'act now']
-        features['urgency_words'] = sum(1 for kw in urgency_keywords if kw in sms_lower)
+        features['urgency_words'] = sum(1 for kw in URGENCY_KEYWORDS if kw in sms_lower)
         
         # Money/financial keywords
-        money_keywords = ['loan', 'credit', 'money', 'cash', 'prize', 'won', 'winner', 'claim', 'reward']
-        features['money_words'] = sum(1 for kw in money_keywords if kw in sms_lower)
+        features['money_words'] = sum(1 for kw in MONEY_KEYWORDS if kw in sms_lower)
         
         # Suspicious keywords specific to Indian scams
-        suspicious = ['rummy', 'betting', 'casino', 'lottery', 'verify account', 'suspended', 'confirm']
-        features['has_suspicious_keywords'] = any(kw in sms_lower for kw in suspicious)
+        features['has_suspicious_keywords'] = any(kw in sms_lower for kw in SUSPICIOUS_KEYWORDS)
+        
+        # Near-duplicate match against known scam campaign templates
+        if len(self.sms_index):
+            features['template_similarity'], _ = self.sms_index.query(sms)
         
         return features
     
-    def _extract_file_features(self, file_hash: str) -> Dict[str, Any]:
+    def _extract_file_features(self, file_hash: str, use_lookup: bool = True) -> Dict[str, Any]:
         """Extract features from file hash/name"""
         features = {
             'raw': file_hash,
@@ -252,13 +433,45 @@ class ScamAnalyzer:
         }
         
         # Check blacklist
-        bl_result = check_blacklist('file', file_hash)
+        bl_result = check_blacklist('file', file_hash) if use_lookup else None
         if bl_result:
             features['in_blacklist'] = True
             features['blacklist_trust'] = bl_result.get('trust_score', 0.8)
         
         return features
     
+    def _extract_upload_features(self, filename: str, hashes: Dict[str, str], apk_info: Optional[Dict[str, Any]], use_lookup: bool = True) -> Dict[str, Any]:
+        """Extract features from uploaded file digests and APK metadata"""
+        name = (filename or '').lower()
+        # Any ZIP is inspected; only a manifest or dex code makes it an APK (not docx/xlsx/zip)
+        has_apk_contents = bool(apk_info) and bool(apk_info.get('has_manifest') or apk_info.get('dex_count', 0) > 0)
+        is_apk = name.endswith('.apk') or has_apk_contents
+        features = {
+            'raw': filename,
+            'length': len(filename or ''),
+            'in_blacklist': False,
+            'blacklist_trust': 0.0,
+            'is_apk': is_apk,
+            'is_executable': name.endswith(('.exe', '.apk', '.dex')) or has_apk_contents,
+            'dangerous_permissions': [],
+            'is_unsigned': False,
+            'is_debug_signed': False
+        }
+        
+        # Check blacklist by each computed digest
+        for digest in (hashes.values() if use_lookup else ()):
+            bl_result = check_blacklist('file', digest)
+            if bl_result:
+                features['in_blacklist'] = True
+                features['blacklist_trust'] = max(features['blacklist_trust'], bl_result.get('trust_score', 0.8))
+        
+        if apk_info and is_apk:
+            features['dangerous_permissions'] = apk_info.get('dangerous_permissions', [])
+            features['is_unsigned'] = apk_info.get('is_valid_zip', False) and not apk_info.get('is_signed', False)
+            features['is_debug_signed'] = apk_info.get('is_debug_signed', False)
+        
+        return features
+    
     def _phone_heuristics(self, phone: str, features: Dict) -> Tuple[float, List[str]]:
         """Apply heuristic rules to phone number"""
         score = 0.5  # neutral starting point
@@ -270,7 +483,8 @@ class ScamAnalyzer:
         
         if features['is_premium']:
             score += 0.3
-            reasons.append("Premium rate number (900/1900 prefix) - high scam risk")
+            region = f" ({features['region']})" if features.get('region') else ""
+            reasons.append(f"Premium rate number{region} - high scam risk")
         
         if not features['is_valid']:
             score += 0.2
@@ -284,6 +498,10 @@ class ScamAnalyzer:
             score += 0.1
             reasons.append("Unusual short code format")
         
+        velocity_score, velocity_reasons = self._velocity_heuristics(features)
+        score += velocity_score
+        reasons.extend(velocity_reasons)
+        
         # Cap score at 1.0
         score = min(1.0, max(0.0, score))
         
@@ -321,6 +539,19 @@ class ScamAnalyzer:
             score += 0.1
             reasons.append("Excessive subdomains detected")
         
+        if features.get('is_lookalike'):
+            score += 0.35
+            if features.get('lookalike_homoglyph'):
+                reasons.append(f"Imitates brand '{features['lookalike_brand']}' with lookalike characters")
+            elif features['brand_distance'] == 0:
+                reasons.append(f"Uses brand name '{features['lookalike_brand']}' on an unofficial domain")
+            else:
+                reasons.append(f"Lookalike of brand '{features['lookalike_brand']}' (edit distance {features['brand_distance']})")
+        
+        velocity_score, velocity_reasons = self._velocity_heuristics(features)
+        score += velocity_score
+        reasons.extend(velocity_reasons)
+        
         score = min(1.0, max(0.0, score))
         
         if score < 0.3:
@@ -349,6 +580,18 @@ class ScamAnalyzer:
             score += 0.15
             reasons.append("Combination of URL and urgency tactics")
         
+        similarity = features.get('template_similarity', 0.0)
+        if similarity >= 0.8:
+            score += 0.35
+            reasons.append(f"Matches a known scam campaign template (similarity: {similarity:.2f})")
+        elif similarity >= 0.5:
+            score += 0.2
+            reasons.append(f"Resembles a known scam campaign template (similarity: {similarity:.2f})")
+        
+        velocity_score, velocity_reasons = self._velocity_heuristics(features)
+        score += velocity_score
+        reasons.extend(velocity_reasons)
+        
         score = min(1.0, max(0.0, score))
         
         if score < 0.3:
@@ -373,6 +616,22 @@ class ScamAnalyzer:
             score += 0.1
             reasons.append("Executable file type detected")
         
+        dangerous = features.get('dangerous_permissions', [])
+        if len(dangerous) >= 2:
+            score += 0.2
+            reasons.append(f"Requests sensitive permissions ({len(dangerous)}): " + ", ".join(p.rsplit('.', 1)[-1] for p in dangerous))
+        
+        if features.get('is_unsigned'):
+            score += 0.15
+            reasons.append("APK is not signed")
+        elif features.get('is_debug_signed'):
+            score += 0.15
+            reasons.append("APK signed with a debug certificate - not from an official store")
+        
+        velocity_score, velocity_reasons = self._velocity_heuristics(features)
+        score += velocity_score
+        reasons.extend(velocity_reasons)
+        
         score = min(1.0, max(0.0, score))
         
         if score < 0.3:
@@ -380,38 +639,33 @@ class ScamAnalyzer:
         
         return score, reasons
     
-    def _ml_predict(self, features: Dict) -> float:
-        """Use ML model to predict scam probability"""
+    def _velocity_heuristics(self, features: Dict) -> Tuple[float, List[str]]:
+        """Score sudden lookup volume of the same indicator"""
+        lookups = features.get('lookups_last_hour', 0)
+        if lookups >= VELOCITY_THRESHOLD:
+            return 0.1, [f"Checked {lookups} times in the last hour - possible active scam campaign"]
+        return 0.0, []
+    
+    def _ml_score(self, input_type: str, features: Dict, mode: str, used_methods: List[str]) -> Tuple[float, List[str]]:
+        """ML score and explanation from the input type's model, if the mode uses one"""
+        if self.model is None or input_type not in self.model or mode not in ["ml", "balanced", "hybrid"]:
+            return 0.5, []
+        
+        ml_score = self._ml_predict(input_type, features)
+        used_methods.append("ml")
+        return ml_score, [f"ML model prediction: {ml_score:.2f}"]
+    
+    def _ml_predict(self, input_type: str, features: Dict) -> float:
+        """Use the input type's ML model to predict scam probability"""
         if self.model is None:
             return 0.5
         
-        # Convert features to numpy array for model
-        feature_vector = self._features_to_vector(features)
-        
         try:
-            # Get probability of scam class
-            proba = self.model.predict_proba([feature_vector])[0]
-            return proba[1] if len(proba) > 1 else proba[0]
+            ml_score = self.model.predict_proba(input_type, features)
+            return 0.5 if ml_score is None else ml_score
         except:
             return 0.5
     
-    def _features_to_vector(self, features: Dict) -> np.ndarray:
-        """Convert feature dict to numpy vector for ML model"""
-        # Extract numeric features in consistent order
-        vector = [
-            float(features.get('length', 0)),
-            float(features.get('in_blacklist', False)),
-            float(features.get('blacklist_trust', 0.0)),
-            float(features.get('is_premium', False)),
-            float(features.get('is_shortcode', False)),
-            float(features.get('has_suspicious_pattern', False)),
-            float(features.get('repeated_digits', 0)),
-            float(features.get('has_url', False)),
-            float(features.get('urgency_words', 0)),
-            float(features.get('money_words', 0)),
-        ]
-        return np.array(vector)
-    
     def _fuse_scores(self, heuristic_score: float, ml_score: float, mode: str, features: Dict) -> float:
         """Fuse heuristic and ML scores based on mode"""
         if mode == "heuristic":
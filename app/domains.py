@@ -0,0 +1,196 @@
+import unicodedata
+from urllib.parse import urlsplit
+from typing import Dict, List, Tuple, Any, Optional, Set
+
+# Protected brand label -> official registrable domains
+PROTECTED_BRANDS: Dict[str, List[str]] = {
+    'sbi': ['sbi.co.in', 'onlinesbi.sbi', 'onlinesbi.com', 'sbi.bank.in'],
+    'onlinesbi': ['onlinesbi.sbi', 'onlinesbi.com'],
+    'hdfcbank': ['hdfcbank.com', 'hdfc.bank.in'],
+    'icicibank': ['icicibank.com', 'icici.bank.in'],
+    'axisbank': ['axisbank.com', 'axis.bank.in'],
+    'kotak': ['kotak.com'],
+    'pnbindia': ['pnbindia.in'],
+    'bankofbaroda': ['bankofbaroda.in'],
+    'canarabank': ['canarabank.com'],
+    'unionbankofindia': ['unionbankofindia.co.in'],
+    'yesbank': ['yesbank.in'],
+    'indusind': ['indusind.com'],
+    'paytm': ['paytm.com', 'paytmbank.com'],
+    'phonepe': ['phonepe.com'],
+    'bhimupi': ['bhimupi.org.in'],
+    'npci': ['npci.org.in'],
+    'uidai': ['uidai.gov.in'],
+    'incometax': ['incometax.gov.in'],
+    'epfindia': ['epfindia.gov.in'],
+    'indiapost': ['indiapost.gov.in'],
+    'irctc': ['irctc.co.in'],
+    'cybercrime': ['cybercrime.gov.in'],
+    'amazon': ['amazon.in', 'amazon.com', 'amazonaws.com', 'media-amazon.com', 'ssl-images-amazon.com'],
+    'flipkart': ['flipkart.com'],
+    'google': ['google.com', 'google.co.in', 'google-analytics.com', 'googleapis.com', 'gstatic.com',
+               'googleusercontent.com', 'googletagmanager.com', 'googlevideo.com', 'youtube.com'],
+    'whatsapp': ['whatsapp.com', 'whatsapp.net'],
+    'facebook': ['facebook.com', 'facebook.net', 'fbcdn.net'],
+    'instagram': ['instagram.com', 'cdninstagram.com'],
+    'microsoft': ['microsoft.com', 'microsoftonline.com', 'live.com', 'office.com'],
+    'apple': ['apple.com', 'icloud.com', 'mzstatic.com'],
+    'netflix': ['netflix.com', 'nflxvideo.net', 'nflximg.net'],
+    'airtel': ['airtel.in'],
+    'jio': ['jio.com'],
+    'bsnl': ['bsnl.co.in'],
+}
+
+# Second-level labels that form part of a public suffix under a ccTLD
+_SECOND_LEVEL_SUFFIXES = {'co', 'com', 'gov', 'org', 'net', 'ac', 'edu', 'nic', 'res', 'bank', 'firm', 'gen', 'ind'}
+
+# Characters and sequences commonly substituted to imitate a brand
+_CONFUSABLES = {
+    'а': 'a', 'е': 'e', 'о': 'o', 'р': 'p', 'с': 'c', 'у': 'y', 'х': 'x',
+    'і': 'l', 'ј': 'j', 'ѕ': 's', 'ԁ': 'd', 'ɡ': 'g', 'ӏ': 'l', 'һ': 'h',
+    'ο': 'o', 'α': 'a', 'ν': 'v', 'ι': 'l', 'κ': 'k', 'τ': 't', 'ρ': 'p',
+    '0': 'o', '1': 'l', 'i': 'l', '3': 'e', '4': 'a', '5': 's', '7': 't', '8': 'b', '@': 'a', '$': 's',
+}
+_SEQUENCE_CONFUSABLES = [('rn', 'm'), ('vv', 'w'), ('cl', 'd')]
+
+def decode_idna(label: str) -> str:
+    """Unicode form of a punycode (xn--) label"""
+    if label.startswith('xn--'):
+        try:
+            return label.encode('ascii').decode('idna')
+        except UnicodeError:
+            pass
+    return label
+
+def skeleton(label: str) -> str:
+    """Collapse homoglyphs so visually similar labels compare equal"""
+    label = unicodedata.normalize('NFKD', label.lower())
+    label = ''.join(_CONFUSABLES.get(ch, ch) for ch in label if not unicodedata.combining(ch))
+    for seq, replacement in _SEQUENCE_CONFUSABLES:
+        label = label.replace(seq, replacement)
+    return label
+
+def levenshtein(a: str, b: str, limit: int) -> int:
+    """Edit distance, returning limit + 1 once it is exceeded"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+def split_host(url: str) -> Tuple[str, str]:
+    """Host and registrable domain of a URL"""
+    if '://' not in url:
+        url = 'http://' + url
+    try:
+        host = (urlsplit(url).hostname or '').rstrip('.')
+    except ValueError:
+        return '', ''
+    labels = host.split('.')
+    if len(labels) >= 3 and len(labels[-1]) == 2 and labels[-2] in _SECOND_LEVEL_SUFFIXES:
+        return host, '.'.join(labels[-3:])
+    return host, '.'.join(labels[-2:])
+
+def _deletes(word: str, depth: int) -> Set[str]:
+    """All strings reachable from word by up to depth deletions"""
+    results = {word}
+    frontier = {word}
+    for _ in range(depth):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        results |= frontier
+    return results
+
+# Brands this short collide with ordinary words one edit away (apple/apply,
+# kotak/kodak), so they only match exactly or through homoglyphs
+SHORT_BRAND_LENGTH = 5
+
+def _tolerance(length: int) -> int:
+    """Edit distance allowed for a label of this length"""
+    if length <= 4:
+        return 0
+    if length <= 8:
+        return 1
+    return 2
+
+def _brand_tolerance(length: int) -> int:
+    """Edit distance allowed from a brand of this length"""
+    return 0 if length <= SHORT_BRAND_LENGTH else _tolerance(length)
+
+class BrandIndex:
+    """Approximate matcher of URL hosts against protected brands"""
+
+    def __init__(self, brands: Optional[Dict[str, List[str]]] = None):
+        brands = brands if brands is not None else PROTECTED_BRANDS
+        self._official = {domain for domains in brands.values() for domain in domains}
+        self._by_skeleton: Dict[str, str] = {}
+        self._brands: Set[str] = set()
+        # Labels longer than this plus the largest tolerance cannot match
+        self._max_length = 0
+        # Symmetric deletion index: any label within edit distance k of a
+        # brand shares a deletion variant with it, so lookups are hash hits
+        self._variants: Dict[str, Set[str]] = {}
+        for brand in brands:
+            self.add_brand(brand)
+
+    def add_brand(self, brand: str, official_domains: Optional[List[str]] = None):
+        self._official.update(official_domains or [])
+        self._brands.add(brand)
+        brand_skeleton = skeleton(brand)
+        if brand_skeleton in self._by_skeleton:
+            return
+        self._by_skeleton[brand_skeleton] = brand
+        self._max_length = max(self._max_length, len(brand_skeleton))
+        for variant in _deletes(brand_skeleton, _brand_tolerance(len(brand_skeleton))):
+            self._variants.setdefault(variant, set()).add(brand_skeleton)
+
+    def _is_official(self, host: str, domain: str) -> bool:
+        """Listed brand domain, or the brand's own name under another public suffix"""
+        labels = host.split('.')
+        if any('.'.join(labels[i:]) in self._official for i in range(len(labels))):
+            return True
+        return decode_idna(domain.split('.')[0]) in self._brands
+
+    def match(self, url: str) -> Optional[Dict[str, Any]]:
+        """Closest impersonated brand for the URL host, if any"""
+        host, domain = split_host(url)
+        if not host or host.replace('.', '').isdigit() or self._is_official(host, domain):
+            return None
+
+        # Brand labels hide in subdomains and hyphenated tokens of the domain
+        suffix_labels = len(domain.split('.')) - 1
+        candidates = set()
+        for label in host.split('.')[:-suffix_labels or None]:
+            label = decode_idna(label)
+            candidates.add(label.replace('-', ''))
+            candidates.update(token for token in label.split('-') if token)
+
+        best = None
+        for candidate in candidates:
+            candidate_skeleton = skeleton(candidate)
+            if len(candidate_skeleton) > self._max_length + _tolerance(self._max_length):
+                continue
+            tolerance = _tolerance(len(candidate_skeleton))
+            matches = set()
+            for variant in _deletes(candidate_skeleton, tolerance):
+                matches.update(self._variants.get(variant, ()))
+            for brand_skeleton in matches:
+                limit = min(tolerance, _brand_tolerance(len(brand_skeleton)))
+                distance = levenshtein(candidate_skeleton, brand_skeleton, limit)
+                if distance > limit:
+                    continue
+                if best is None or distance < best['distance']:
+                    best = {
+                        'brand': self._by_skeleton[brand_skeleton],
+                        'distance': distance,
+                        'token': candidate,
+                        # Same skeleton but different characters than the brand
+                        'homoglyph': distance == 0 and candidate.lower() != self._by_skeleton[brand_skeleton],
+                        'host': host,
+                    }
+        return best
@@ -0,0 +1,199 @@
+import hashlib
+import mmap
+import struct
+import tempfile
+import zipfile
+import zlib
+from typing import BinaryIO, Dict, List, Any, Iterable, Optional, Tuple
+
+CHUNK_SIZE = 1024 * 1024  # 1 MB
+HASH_ALGORITHMS = ('sha256', 'md5', 'sha1')
+
+# Members larger than this are not read out of the archive
+MAX_MEMBER_SIZE = 4 * 1024 * 1024
+
+ZIP_MAGIC = b'PK\x03\x04'
+
+# Raised by ZipFile.read for corrupt streams, CRC mismatches, unknown
+# compression methods and encrypted members
+MEMBER_READ_ERRORS = (zipfile.BadZipFile, zlib.error, NotImplementedError, RuntimeError, EOFError)
+
+# Permissions commonly requested by banking trojans and SMS stealers
+DANGEROUS_PERMISSIONS = [
+    'android.permission.READ_SMS',
+    'android.permission.RECEIVE_SMS',
+    'android.permission.SEND_SMS',
+    'android.permission.READ_CALL_LOG',
+    'android.permission.CALL_PHONE',
+    'android.permission.BIND_ACCESSIBILITY_SERVICE',
+    'android.permission.SYSTEM_ALERT_WINDOW',
+    'android.permission.REQUEST_INSTALL_PACKAGES',
+    'android.permission.READ_CONTACTS',
+]
+
+SIGNATURE_SUFFIXES = ('.RSA', '.DSA', '.EC')
+
+class StreamingHasher:
+    """Computes several digests over a stream in a single pass"""
+
+    def __init__(self, algorithms: Iterable[str] = ('sha256',)):
+        self._hashes = {name: hashlib.new(name) for name in algorithms}
+        self.size = 0
+
+    def update(self, chunk: bytes):
+        self.size += len(chunk)
+        for h in self._hashes.values():
+            h.update(chunk)
+
+    def hexdigests(self) -> Dict[str, str]:
+        return {name: h.hexdigest() for name, h in self._hashes.items()}
+
+class _MappedFile:
+    """Minimal file object over an mmap so zipfile can read it without copying"""
+
+    def __init__(self, mm: mmap.mmap):
+        self._mm = mm
+
+    def read(self, size: int = -1) -> bytes:
+        return self._mm.read(size)
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        try:
+            self._mm.seek(offset, whence)
+        except ValueError as e:
+            # zipfile expects OSError for out-of-range seeks on short files
+            raise OSError(str(e)) from e
+        return self._mm.tell()
+
+    def tell(self) -> int:
+        return self._mm.tell()
+
+    def seekable(self) -> bool:
+        return True
+
+def _read_member(zf: zipfile.ZipFile, info: zipfile.ZipInfo) -> Optional[bytes]:
+    """Read an archive member unless it exceeds MAX_MEMBER_SIZE"""
+    if info.file_size > MAX_MEMBER_SIZE:
+        return None
+    return zf.read(info)
+
+def _axml_strings(data: bytes) -> List[str]:
+    """Extract the string pool from a binary AndroidManifest.xml"""
+    strings = []
+    try:
+        # File header (8 bytes) is followed by the string pool chunk
+        chunk_type, header_size, _, count, _, flags, strings_start = struct.unpack_from('<HHIIIII', data, 8)
+        if chunk_type != 0x0001:
+            return strings
+        is_utf8 = bool(flags & 0x100)
+        offsets = struct.unpack_from(f'<{count}I', data, 8 + header_size)
+        base = 8 + strings_start
+        for offset in offsets:
+            pos = base + offset
+            if is_utf8:
+                # Character length then byte length, each 1 or 2 bytes
+                pos += 2 if data[pos] & 0x80 else 1
+                length = data[pos]
+                if length & 0x80:
+                    length = ((length & 0x7F) << 8) | data[pos + 1]
+                    pos += 1
+                pos += 1
+                strings.append(data[pos:pos + length].decode('utf-8', 'replace'))
+            else:
+                length = struct.unpack_from('<H', data, pos)[0]
+                if length & 0x8000:
+                    length = ((length & 0x7FFF) << 16) | struct.unpack_from('<H', data, pos + 2)[0]
+                    pos += 2
+                pos += 2
+                strings.append(data[pos:pos + length * 2].decode('utf-16-le', 'replace'))
+    except (struct.error, IndexError):
+        pass
+    return strings
+
+def inspect_apk(path: str) -> Dict[str, Any]:
+    """Read manifest and signing metadata from an APK via its central directory"""
+    info = {
+        'is_valid_zip': False,
+        'entry_count': 0,
+        'dex_count': 0,
+        'has_manifest': False,
+        'permissions': [],
+        'dangerous_permissions': [],
+        'signature_files': [],
+        'is_signed': False,
+        'is_debug_signed': False,
+        'manifest_unreadable': False,
+    }
+
+    with open(path, 'rb') as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return info  # empty file
+
+        with mm:
+            try:
+                zf = zipfile.ZipFile(_MappedFile(mm))
+            except zipfile.BadZipFile:
+                return info
+
+            with zf:
+                info['is_valid_zip'] = True
+                members = zf.infolist()
+                info['entry_count'] = len(members)
+
+                for member in members:
+                    name = member.filename
+                    if name.endswith('.dex') and '/' not in name:
+                        info['dex_count'] += 1
+                    elif name == 'AndroidManifest.xml':
+                        info['has_manifest'] = True
+                        try:
+                            manifest = _read_member(zf, member)
+                        except MEMBER_READ_ERRORS:
+                            info['manifest_unreadable'] = True
+                            continue
+                        if manifest:
+                            permissions = sorted({
+                                s for s in _axml_strings(manifest)
+                                if s.startswith('android.permission.')
+                            })
+                            info['permissions'] = permissions
+                            info['dangerous_permissions'] = [
+                                p for p in permissions if p in DANGEROUS_PERMISSIONS
+                            ]
+                    elif name.startswith('META-INF/') and name.upper().endswith(SIGNATURE_SUFFIXES):
+                        info['signature_files'].append(name)
+                        info['is_signed'] = True
+                        try:
+                            cert = _read_member(zf, member)
+                        except MEMBER_READ_ERRORS:
+                            continue
+                        if cert and b'Android Debug' in cert:
+                            info['is_debug_signed'] = True
+
+    return info
+
+def hash_and_inspect(stream: BinaryIO, algorithms: Iterable[str] = ('sha256',)) -> Tuple[Dict[str, str], Optional[Dict[str, Any]]]:
+    """Hash an uploaded stream and inspect it if it is a ZIP/APK
+    
+    Blocking; run it off the event loop. Only ZIP payloads are spooled to
+    disk so the central directory can be mapped instead of held in memory.
+    """
+    hasher = StreamingHasher(algorithms)
+    apk_info = None
+    
+    with tempfile.NamedTemporaryFile(suffix=".upload") as spool:
+        chunk = stream.read(CHUNK_SIZE)
+        is_zip = chunk.startswith(ZIP_MAGIC)
+        while chunk:
+            hasher.update(chunk)
+            if is_zip:
+                spool.write(chunk)
+            chunk = stream.read(CHUNK_SIZE)
+        
+        if is_zip:
+            spool.flush()
+            apk_info = inspect_apk(spool.name)
+    
+    return hasher.hexdigests(), apk_info
@@ -0,0 +1,16 @@
+import re
+
+def normalize_indicator(input_type: str, value: str) -> str:
+    """Canonical form of an indicator so trivial variants share a key"""
+    value = value.strip()
+    if input_type == 'phone':
+        digits = re.sub(r'[^0-9]', '', value)
+        return digits or value.lower()
+    if input_type == 'url':
+        value = re.sub(r'^[a-z]+://', '', value.lower())
+        if value.startswith('www.'):
+            value = value[4:]
+        return value.rstrip('/')
+    if input_type == 'sms':
+        return re.sub(r'\s+', ' ', value.lower())
+    return value.lower()
@@ -1,10 +1,30 @@
-from fastapi import FastAPI, HTTPException
+import time
+_import_started = time.perf_counter()
+
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, WebSocket, WebSocketDisconnect, Header, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from app.models import AnalyzeRequest, AnalyzeResponse, HealthResponse
+from fastapi.concurrency import run_in_threadpool
+from app.models import AnalyzeRequest, AnalyzeResponse, FileAnalyzeResponse, HealthResponse, Mode
+from app.models import LabelRequest, LabelResponse
 from app.analyzers import ScamAnalyzer
-from app.db import init_db, seed_blacklist, check_blacklist
-from app.train import train_model
+from app.db import init_db, seed_blacklist, replicas
+from app.admission import AdmissionController, Overloaded
+from app.singleflight import SingleFlight
+from app.scorer import ModelBundle, SCORER_PATH
+from app.phone_prefixes import PhonePrefixTable, PREFIX_TABLE_PATH
+from app.profiling import StartupProfile
+import hmac
 import os
+import threading
+
+# Upload handling (app.files), streaming (app.streaming), training and the
+# prefix table builder are imported where used to keep them off cold start
+
+# Token required by endpoints that change shared state, which are disabled while it is unset
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '')
+
+startup_profile = StartupProfile()
+startup_profile.record("import", time.perf_counter() - _import_started)
 
 app = FastAPI(
     title="Scam Detection API",
@@ -24,32 +44,119 @@ app.add_middleware(
 # Initialize analyzer
 analyzer = None
 
+# Load shedding in front of the analysis handlers
+admission = AdmissionController()
+
+# Collapses identical concurrent analyze requests
+singleflight = SingleFlight()
+
+async def run_admitted(fn):
+    """Run fn(degraded) through admission control, 429 if shed"""
+    try:
+        return await admission.run(fn)
+    except Overloaded:
+        raise HTTPException(
+            status_code=429,
+            detail="Server overloaded, please retry shortly",
+            headers={"Retry-After": "1"}
+        )
+
+async def analyze_coalesced(input_type: str, value: str, mode: str):
+    """Analyze through admission control, sharing identical in-flight work
+    
+    The key uses the exact input: features such as the URL scheme or a
+    leading '+' depend on formatting, so normalized variants may differ.
+    """
+    result, shared = await singleflight.do(
+        (input_type, value, mode),
+        lambda: run_admitted(
+            lambda degraded: analyzer.analyze(input_type, value, mode, degraded=degraded)
+        )
+    )
+    if shared:
+        # Coalesced callers skipped analyze(), still count their lookup
+        analyzer.record_lookup(input_type, value)
+    return result
+
+def provision_artifacts(train: bool, build_prefixes: bool):
+    """Train/build missing artifacts, swap them in and save a warm snapshot
+    
+    Runs after startup so a replica serves heuristic results immediately
+    instead of blocking on a build.
+    """
+    if train:
+        print("Model not found, training in background...")
+        # Imported lazily so sklearn stays off the serving path
+        from app.train import train_model
+        train_model()
+        analyzer.model = ModelBundle.load(SCORER_PATH)
+    
+    if build_prefixes:
+        print("Phone prefix table not found, building in background...")
+        from app.phone_prefixes import build_table
+        build_table(PREFIX_TABLE_PATH)
+        analyzer.prefix_table = PhonePrefixTable.load(PREFIX_TABLE_PATH)
+    
+    analyzer.save_warm()
+    print("Warm state saved")
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize database and model on startup"""
     global analyzer
     
     print("Initializing database...")
-    init_db()
-    seed_blacklist()
-    
-    # Check if model exists, if not train one
-    if not os.path.exists("app/scam_model.pkl"):
-        print("Model not found, training...")
-        train_model()
+    with startup_profile.phase("init_db"):
+        init_db()
+    with startup_profile.phase("seed_blacklist"):
+        seed_blacklist()
     
     print("Loading analyzer...")
-    analyzer = ScamAnalyzer()
-    print("Startup complete!")
+    with startup_profile.phase("load_analyzer"):
+        analyzer = ScamAnalyzer.load_warm()
+    
+    # Missing artifacts and a fresh snapshot are produced off the startup path
+    train = analyzer.model is None
+    build_prefixes = analyzer.prefix_table is None
+    if train or build_prefixes or not analyzer.warm:
+        threading.Thread(target=provision_artifacts, args=(train, build_prefixes), daemon=True).start()
+    
+    report = startup_profile.report()
+    print(f"Startup complete in {report['total_ms']:.0f} ms (target {report['target_ms']:.0f} ms)")
+    if not report["within_target"]:
+        print(f"Cold start over target: {report['phases_ms']}")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Persist in-memory state that should survive restarts"""
+    try:
+        if analyzer is not None:
+            analyzer.velocity.save()
+            analyzer.save_warm()
+    finally:
+        replicas.close()
 
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     """Health check endpoint"""
     global analyzer
+    model = analyzer.model if analyzer is not None else None
     return {
         "status": "healthy",
         "database": "connected",
-        "model_loaded": analyzer is not None and analyzer.model is not None
+        "model_loaded": model is not None,
+        "model_version": model.model_version if model is not None else "",
+        "model_types": sorted(model.scorers) if model is not None else []
+    }
+
+@app.get("/stats")
+async def stats():
+    """Admission, request coalescing, cold start and replica counters"""
+    return {
+        "admission": admission.stats(),
+        "coalescing": singleflight.stats(),
+        "startup": startup_profile.report(),
+        "database": replicas.stats()
     }
 
 @app.post("/analyze/phone", response_model=AnalyzeResponse)
@@ -61,7 +168,7 @@ async def analyze_phone(request: AnalyzeRequest):
     if analyzer is None:
         raise HTTPException(status_code=503, detail="Analyzer not initialized")
     
-    result = analyzer.analyze("phone", request.phone, request.mode)
+    result = await analyze_coalesced("phone", request.phone, request.mode)
     return result
 
 @app.post("/analyze/url", response_model=AnalyzeResponse)
@@ -73,7 +180,7 @@ async def analyze_url(request: AnalyzeRequest):
     if analyzer is None:
         raise HTTPException(status_code=503, detail="Analyzer not initialized")
     
-    result = analyzer.analyze("url", request.url, request.mode)
+    result = await analyze_coalesced("url", request.url, request.mode)
     return result
 
 @app.post("/analyze/sms", response_model=AnalyzeResponse)
@@ -85,7 +192,7 @@ async def analyze_sms(request: AnalyzeRequest):
     if analyzer is None:
         raise HTTPException(status_code=503, detail="Analyzer not initialized")
     
-    result = analyzer.analyze("sms", request.sms, request.mode)
+    result = await analyze_coalesced("sms", request.sms, request.mode)
     return result
 
 @app.post("/analyze/file", response_model=AnalyzeResponse)
@@ -97,9 +204,76 @@ async def analyze_file(request: AnalyzeRequest):
     if analyzer is None:
         raise HTTPException(status_code=503, detail="Analyzer not initialized")
     
-    result = analyzer.analyze("file", request.file, request.mode)
+    result = await analyze_coalesced("file", request.file, request.mode)
     return result
 
+@app.post("/analyze/file/upload", response_model=FileAnalyzeResponse)
+async def analyze_file_upload(
+    file: UploadFile = File(...),
+    mode: Mode = Form("balanced"),
+    all_hashes: bool = Form(False)
+):
+    """Stream an uploaded file, hash it and inspect APK metadata"""
+    if analyzer is None:
+        raise HTTPException(status_code=503, detail="Analyzer not initialized")
+    
+    from app.files import hash_and_inspect, HASH_ALGORITHMS
+    
+    # Hashing and APK inspection are CPU and disk bound, keep them off the event loop
+    hashes, apk_info = await run_in_threadpool(
+        hash_and_inspect, file.file, HASH_ALGORITHMS if all_hashes else ('sha256',)
+    )
+    result = await run_admitted(
+        lambda degraded: analyzer.analyze_upload(file.filename or "", hashes, apk_info, mode, degraded=degraded)
+    )
+    return result
+
+@app.websocket("/ws/analyze/stream")
+async def analyze_stream(websocket: WebSocket, mode: Mode = "balanced"):
+    """Score an SMS thread or call transcript chunk by chunk
+    
+    Each text message is appended to the session and answered with the
+    updated verdict. Chunks are concatenated as sent.
+    """
+    await websocket.accept()
+    
+    if analyzer is None:
+        await websocket.close(code=1013, reason="Analyzer not initialized")
+        return
+    
+    from app.streaming import StreamSession, MAX_CHUNK_CHARS
+    
+    session = StreamSession(analyzer, mode)
+    try:
+        while True:
+            chunk = await websocket.receive_text()
+            if len(chunk) > MAX_CHUNK_CHARS:
+                await websocket.close(code=1009, reason=f"Chunk exceeds {MAX_CHUNK_CHARS} characters")
+                return
+            await websocket.send_json(session.feed(chunk))
+    except WebSocketDisconnect:
+        pass
+
+def require_admin(x_admin_token: str = Header(default="")):
+    """Reject callers that do not present the admin token"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled")
+    if not hmac.compare_digest(x_admin_token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+@app.post("/label/sms", response_model=LabelResponse, dependencies=[Depends(require_admin)])
+async def label_sms(request: LabelRequest):
+    """Record a labelled SMS and add scam templates to the index"""
+    if not request.sms:
+        raise HTTPException(status_code=400, detail="SMS text is required")
+    
+    if analyzer is None:
+        raise HTTPException(status_code=503, detail="Analyzer not initialized")
+    
+    # Database write and index insert, keep them off the event loop
+    await run_in_threadpool(analyzer.add_sms_template, request.sms, request.label)
+    return {"status": "labelled", "templates": len(analyzer.sms_index)}
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,126 @@
+import re
+import threading
+import zlib
+import numpy as np
+from typing import Dict, List, Tuple, Any, Optional, Iterable, Set
+
+NUM_PERM = 64
+NUM_BANDS = 16  # 4 rows per band, candidate threshold around 0.5 Jaccard
+SHINGLE_SIZE = 5
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+
+def normalize_sms(text: str) -> str:
+    """Mask the parts scam campaigns vary between messages"""
+    text = text.lower()
+    text = re.sub(r'(https?://|www\.)\S+', ' <url> ', text)
+    text = re.sub(r'\S+@\S+', ' <email> ', text)
+    text = re.sub(r'(rs\.?|inr|₹)?\s*\d[\d,.]*', ' <num> ', text)
+    text = re.sub(r'[^\w<>]+', ' ', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> Set[str]:
+    """Character shingles of already normalized text"""
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+class MinHasher:
+    """Fixed family of hash permutations shared by signatures and the index"""
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = 1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self._a = rng.randint(1, (1 << 32) - 1, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, (1 << 32) - 1, size=num_perm, dtype=np.uint64)
+
+    def empty(self) -> np.ndarray:
+        return np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+
+    def update(self, signature: np.ndarray, items: Iterable[str]) -> np.ndarray:
+        """Fold more shingles into a signature in place"""
+        hv = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in items), dtype=np.uint64)
+        if hv.size:
+            permuted = np.bitwise_and((np.outer(hv, self._a) + self._b) % _MERSENNE_PRIME, _MAX_HASH)
+            np.minimum(signature, permuted.min(axis=0), out=signature)
+        return signature
+
+    def signature(self, text: str) -> np.ndarray:
+        return self.update(self.empty(), shingles(normalize_sms(text)))
+
+class MinHashIndex:
+    """LSH index over MinHash signatures of known scam templates"""
+
+    def __init__(self, num_perm: int = NUM_PERM, num_bands: int = NUM_BANDS):
+        if num_perm % num_bands:
+            raise ValueError("num_perm must be divisible by num_bands")
+        self.hasher = MinHasher(num_perm)
+        self.num_bands = num_bands
+        self.rows = num_perm // num_bands
+        self._signatures: Dict[Any, np.ndarray] = {}
+        self._buckets: List[Dict[bytes, List[Any]]] = [{} for _ in range(num_bands)]
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Buckets and the lock are derived state; pickle one signature matrix.
+        # Copy under the lock, templates may be inserted while a snapshot is taken
+        with self._lock:
+            keys = list(self._signatures)
+            rows = [self._signatures[key] for key in keys]
+        signatures = np.stack(rows) if rows else np.empty((0, self.hasher.num_perm), dtype=np.uint64)
+        return {'num_perm': self.hasher.num_perm, 'num_bands': self.num_bands, 'keys': keys, 'signatures': signatures}
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__init__(state['num_perm'], state['num_bands'])
+        self.insert_signatures(state['keys'], state['signatures'])
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.num_bands)]
+
+    def insert(self, key: Any, text: str):
+        """Add a template; re-inserting an existing key is a no-op"""
+        self.insert_signature(key, self.hasher.signature(text))
+
+    def insert_signature(self, key: Any, signature: np.ndarray):
+        with self._lock:
+            if key in self._signatures:
+                return
+            self._signatures[key] = signature
+            for band, band_key in zip(self._buckets, self._band_keys(signature)):
+                band.setdefault(band_key, []).append(key)
+
+    def insert_signatures(self, keys: List[Any], signatures: np.ndarray):
+        """Bulk insert rows of a signature matrix, slicing band keys per band"""
+        width = self.rows * signatures.itemsize
+        with self._lock:
+            fresh = []
+            for i, key in enumerate(keys):
+                if key not in self._signatures:
+                    self._signatures[key] = signatures[i]
+                    fresh.append(i)
+            if not fresh:
+                return
+            for band_index, band in enumerate(self._buckets):
+                block = np.ascontiguousarray(signatures[fresh, band_index * self.rows:(band_index + 1) * self.rows]).tobytes()
+                for j, i in enumerate(fresh):
+                    band.setdefault(block[j * width:(j + 1) * width], []).append(keys[i])
+
+    def query(self, text: str) -> Tuple[float, Optional[Any]]:
+        """Best estimated Jaccard similarity and matching key"""
+        return self.query_signature(self.hasher.signature(text))
+
+    def query_signature(self, signature: np.ndarray) -> Tuple[float, Optional[Any]]:
+        candidates = set()
+        for band, band_key in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(band.get(band_key, ()))
+
+        best_score, best_key = 0.0, None
+        for key in candidates:
+            score = float(np.mean(self._signatures[key] == signature))
+            if score > best_score:
+                best_score, best_key = score, key
+        return best_score, best_key
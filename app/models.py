@@ -1,20 +1,37 @@
 from pydantic import BaseModel
-from typing import List, Optional, Literal
+from typing import List, Optional, Literal, Dict, Any
+
+Mode = Literal["heuristic", "ml", "balanced", "hybrid"]
 
 class AnalyzeRequest(BaseModel):
     phone: Optional[str] = None
     url: Optional[str] = None
     sms: Optional[str] = None
     file: Optional[str] = None
-    mode: Literal["heuristic", "ml", "balanced", "hybrid"] = "balanced"
+    mode: Mode = "balanced"
 
 class AnalyzeResponse(BaseModel):
     label: Literal["scam", "likely_scam", "suspicious", "benign"]
     confidence: float
     explain: List[str]
     used_methods: List[str]
+    degraded: bool = False
+
+class FileAnalyzeResponse(AnalyzeResponse):
+    hashes: Dict[str, str]
+    apk: Optional[Dict[str, Any]] = None
+
+class LabelRequest(BaseModel):
+    sms: str
+    label: Literal["scam", "likely_scam", "suspicious", "benign"] = "scam"
+
+class LabelResponse(BaseModel):
+    status: str
+    templates: int
 
 class HealthResponse(BaseModel):
     status: str
     database: str
     model_loaded: bool
+    model_version: str = ""
+    model_types: List[str] = []
@@ -0,0 +1,291 @@
+"""Precomputed phone prefix tables
+
+Build once from phonenumbers metadata with ``python -m app.phone_prefixes``.
+The output is a flat file of column arrays (sorted prefix keys, region, line
+type, carrier index) followed by a carrier name table. Serving mmaps it and
+resolves a number with one vectorized search over its candidate prefixes,
+without loading phonenumbers' lazy carrier/geo data.
+"""
+import mmap
+import os
+import struct
+import numpy as np
+from typing import Dict, List, Tuple, Any, Optional, Set
+
+try:
+    import re._constants as _sre
+    import re._parser as _sre_parse
+except ImportError:  # Python < 3.11
+    import sre_constants as _sre
+    import sre_parse as _sre_parse
+
+PREFIX_TABLE_PATH = "app/phone_prefixes.bin"
+
+MAGIC = b'PHPX'
+VERSION = 1
+HEADER = struct.Struct('<4sHIIxx')  # magic, version, record count, carrier count
+MAX_PREFIX_LENGTH = 12
+
+NO_LINE_TYPE = 255
+NO_CARRIER = 0xFFFF
+
+# phonenumbers.PhoneNumberType values
+LINE_TYPES = {
+    0: 'fixed_line',
+    1: 'mobile',
+    2: 'fixed_line_or_mobile',
+    3: 'toll_free',
+    4: 'premium_rate',
+    5: 'shared_cost',
+    6: 'voip',
+    7: 'personal_number',
+    8: 'pager',
+    9: 'uan',
+    10: 'voicemail',
+}
+
+FIXED_LINE = 0
+MOBILE = 1
+FIXED_LINE_OR_MOBILE = 2
+
+# National prefix depth explored when classifying line types
+MAX_NATIONAL_DEPTH = 5
+# Depth past which a prefix shared by several regions is recorded without one
+MAX_REGION_DEPTH = 3
+
+def prefix_key(prefix: str) -> int:
+    """Unique integer key for a digit prefix (length in the high bits)"""
+    return (len(prefix) << 40) | int(prefix)
+
+class PhonePrefixTable:
+    """Longest-prefix lookup of region, carrier and line type"""
+
+    def __init__(self, buf):
+        magic, version, count, carrier_count = HEADER.unpack_from(buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Unsupported phone prefix table")
+        self._buf = buf
+        self._count = count
+        offset = HEADER.size
+        self._keys = np.frombuffer(buf, dtype='<u8', count=count, offset=offset)
+        offset += 8 * count
+        self._regions = np.frombuffer(buf, dtype='S2', count=count, offset=offset)
+        offset += 2 * count
+        self._carrier_ids = np.frombuffer(buf, dtype='<u2', count=count, offset=offset)
+        offset += 2 * count
+        self._line_types = np.frombuffer(buf, dtype='u1', count=count, offset=offset)
+        offset += count
+        self._carriers = bytes(buf[offset:]).decode('utf-8').split('\n')[:carrier_count]
+
+    @classmethod
+    def load(cls, path: str = PREFIX_TABLE_PATH) -> Optional["PhonePrefixTable"]:
+        """Map the table file, returns None if missing or unreadable"""
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            return cls(buf)
+        except (OSError, ValueError, struct.error):
+            return None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def lookup(self, digits: str) -> Dict[str, Any]:
+        """Resolve an international number (country code + national digits)"""
+        result = {'region': '', 'carrier': '', 'line_type': ''}
+        if not digits.isdigit() or not self._count:
+            return result
+
+        candidates = np.array(
+            [prefix_key(digits[:length]) for length in range(min(len(digits), MAX_PREFIX_LENGTH), 0, -1)],
+            dtype=np.uint64
+        )
+        positions = np.minimum(np.searchsorted(self._keys, candidates), self._count - 1)
+
+        # Candidates run longest first, so the longest prefix wins for each field
+        for i in positions[self._keys[positions] == candidates]:
+            region = self._regions[i].decode('ascii')
+            line_type = int(self._line_types[i])
+            carrier = int(self._carrier_ids[i])
+            if region and not result['region']:
+                result['region'] = region
+            if line_type != NO_LINE_TYPE and not result['line_type']:
+                result['line_type'] = LINE_TYPES.get(line_type, '')
+            if carrier != NO_CARRIER and not result['carrier']:
+                result['carrier'] = self._carriers[carrier]
+        return result
+
+def _in_class(items, ch: str) -> bool:
+    matched, negate = False, False
+    for op, av in items:
+        if op is _sre.NEGATE:
+            negate = True
+        elif op is _sre.LITERAL:
+            matched = matched or ord(ch) == av
+        elif op is _sre.RANGE:
+            matched = matched or av[0] <= ord(ch) <= av[1]
+        elif op is _sre.CATEGORY:
+            matched = matched or ch.isdigit()
+    return matched != negate
+
+def _advance(items, positions: Set[int], prefix: str) -> Set[int]:
+    """Prefix positions reachable after matching a parsed pattern sequence
+
+    Position len(prefix) means the whole prefix has been consumed and is
+    absorbing: the rest of the pattern can always be satisfied by digits.
+    """
+    end = len(prefix)
+    for op, av in items:
+        reached = set()
+        for i in positions:
+            if i == end:
+                reached.add(end)
+            elif op is _sre.LITERAL:
+                if ord(prefix[i]) == av:
+                    reached.add(i + 1)
+            elif op is _sre.IN:
+                if _in_class(av, prefix[i]):
+                    reached.add(i + 1)
+            elif op is _sre.CATEGORY:
+                if prefix[i].isdigit():
+                    reached.add(i + 1)
+            elif op is _sre.SUBPATTERN:
+                reached |= _advance(av[-1], {i}, prefix)
+            elif op is _sre.BRANCH:
+                for alternative in av[1]:
+                    reached |= _advance(alternative, {i}, prefix)
+            elif op in (_sre.MAX_REPEAT, _sre.MIN_REPEAT):
+                low, high, sub = av
+                # Every repetition consumes a digit until the prefix is used up
+                high = min(high, low + end + 1)
+                current = {i}
+                if low == 0:
+                    reached.add(i)
+                for count in range(1, high + 1):
+                    current = _advance(sub, current, prefix)
+                    if not current:
+                        break
+                    if count >= low:
+                        reached |= current
+            else:
+                raise ValueError(f"Unsupported pattern element: {op}")
+        positions = reached
+        if not positions:
+            break
+    return positions
+
+def _viable(parsed, prefix: str) -> bool:
+    """True if some full match of the parsed pattern starts with prefix"""
+    return len(prefix) in _advance(parsed, {0}, prefix)
+
+# Checked in the same order as phonenumbers.number_type
+_DESC_TYPES = [
+    ('premium_rate', 4), ('toll_free', 3), ('shared_cost', 5), ('voip', 6),
+    ('personal_number', 7), ('pager', 8), ('uan', 9), ('voicemail', 10),
+    ('fixed_line', FIXED_LINE), ('mobile', MOBILE),
+]
+
+def _region_descs(phonenumbers, country_code: int) -> List[Tuple[str, List[Tuple[int, Any, int]]]]:
+    """Parsed (line type, pattern, max length) per region sharing the country code"""
+    result = []
+    for region in phonenumbers.COUNTRY_CODE_TO_REGION_CODE.get(country_code, ()):
+        if region == '001':
+            metadata = phonenumbers.PhoneMetadata.metadata_for_nongeo_region(country_code)
+        else:
+            metadata = phonenumbers.PhoneMetadata.metadata_for_region(region)
+        if metadata is None:
+            continue
+        descs = []
+        same_fixed_mobile = getattr(metadata, 'same_mobile_and_fixed_line_pattern', False)
+        for attr, number_type in _DESC_TYPES:
+            desc = getattr(metadata, attr, None)
+            if desc is None or not desc.national_number_pattern:
+                continue
+            if same_fixed_mobile and number_type == MOBILE:
+                continue
+            if same_fixed_mobile and number_type == FIXED_LINE:
+                number_type = FIXED_LINE_OR_MOBILE
+            lengths = [l for l in (desc.possible_length or metadata.general_desc.possible_length) if l > 0]
+            descs.append((number_type, _sre_parse.parse(desc.national_number_pattern), max(lengths or [MAX_PREFIX_LENGTH])))
+        result.append((region if region != '001' else '', descs))
+    return result
+
+def _line_type_prefixes(phonenumbers, country_code: int) -> Dict[str, Tuple[str, int]]:
+    """Shortest national prefixes that determine a single line type"""
+    regions = _region_descs(phonenumbers, country_code)
+
+    entries = {}
+    stack = [d for d in '9876543210']
+    while stack:
+        prefix = stack.pop()
+        seen = set()
+        for region, descs in regions:
+            for number_type, parsed, max_length in descs:
+                if len(prefix) <= max_length and _viable(parsed, prefix):
+                    seen.add((number_type, region))
+        if not seen:
+            continue
+        types = {number_type for number_type, _ in seen}
+        regions_seen = {region for _, region in seen}
+        region = regions_seen.pop() if len(regions_seen) == 1 else ''
+        if len(types) == 1 and (region or len(prefix) >= MAX_REGION_DEPTH):
+            entries[prefix] = (region, types.pop())
+        elif len(prefix) < MAX_NATIONAL_DEPTH:
+            stack.extend(prefix + d for d in '9876543210')
+        elif types <= {FIXED_LINE, MOBILE, FIXED_LINE_OR_MOBILE}:
+            # Interleaved fixed/mobile ranges below the depth limit
+            entries[prefix] = (region, FIXED_LINE_OR_MOBILE)
+    return entries
+
+def build_table(path: str = PREFIX_TABLE_PATH, country_codes: Optional[List[int]] = None) -> int:
+    """Build the prefix table from phonenumbers metadata, returns record count"""
+    import phonenumbers
+    from phonenumbers.carrierdata import CARRIER_DATA
+
+    # prefix -> [region, line type, carrier index]
+    records: Dict[str, List[Any]] = {}
+
+    for country_code, regions in phonenumbers.COUNTRY_CODE_TO_REGION_CODE.items():
+        if country_codes is not None and country_code not in country_codes:
+            continue
+        main_region = regions[0] if regions and regions[0] != '001' else ''
+        records[str(country_code)] = [main_region, NO_LINE_TYPE, NO_CARRIER]
+        for national_prefix, (region, number_type) in _line_type_prefixes(phonenumbers, country_code).items():
+            prefix = str(country_code) + national_prefix
+            if len(prefix) <= MAX_PREFIX_LENGTH:
+                records[prefix] = [region, number_type, NO_CARRIER]
+
+    carriers: List[str] = []
+    carrier_index: Dict[str, int] = {}
+    for prefix, names in CARRIER_DATA.items():
+        name = names.get('en') or next(iter(names.values()), '')
+        if not name or len(prefix) > MAX_PREFIX_LENGTH:
+            continue
+        if country_codes is not None and not any(prefix.startswith(str(cc)) for cc in country_codes):
+            continue
+        if name not in carrier_index:
+            carrier_index[name] = len(carriers)
+            carriers.append(name)
+        record = records.setdefault(prefix, ['', NO_LINE_TYPE, NO_CARRIER])
+        record[2] = carrier_index[name]
+
+    keys = sorted(records, key=prefix_key)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(keys), len(carriers)))
+        f.write(np.array([prefix_key(p) for p in keys], dtype='<u8').tobytes())
+        f.write(np.array([records[p][0].encode('ascii') for p in keys], dtype='S2').tobytes())
+        f.write(np.array([records[p][2] for p in keys], dtype='<u2').tobytes())
+        f.write(np.array([records[p][1] for p in keys], dtype='u1').tobytes())
+        f.write('\n'.join(carriers).encode('utf-8'))
+    os.replace(tmp_path, path)
+    return len(keys)
+
+if __name__ == "__main__":
+    import time
+    start = time.time()
+    count = build_table()
+    size = os.path.getsize(PREFIX_TABLE_PATH) / 1024
+    print(f"Built {count} prefix records ({size:.1f} KB) in {time.time() - start:.1f}s -> {PREFIX_TABLE_PATH}")
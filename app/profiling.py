@@ -0,0 +1,89 @@
+"""Import-time and cold start profiling
+
+    python -m app.profiling
+
+Prints the slowest imports of app.main and the startup phase timings, and
+exits non-zero if the cold start misses COLD_START_TARGET seconds.
+"""
+import os
+import re
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Tuple, Any
+
+# Import plus startup budget for a new replica, in seconds
+COLD_START_TARGET = float(os.getenv('COLD_START_TARGET', '1.5'))
+
+IMPORT_REPORT_TOP = 15
+
+_IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$')
+
+class StartupProfile:
+    """Wall-clock durations of named startup phases"""
+
+    def __init__(self, target: float = COLD_START_TARGET):
+        self.target = target
+        self.phases: Dict[str, float] = {}
+
+    def record(self, name: str, seconds: float):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def total(self) -> float:
+        return sum(self.phases.values())
+
+    def report(self) -> Dict[str, Any]:
+        total = self.total()
+        return {
+            "phases_ms": {name: round(seconds * 1000, 1) for name, seconds in self.phases.items()},
+            "total_ms": round(total * 1000, 1),
+            "target_ms": round(self.target * 1000, 1),
+            "within_target": total <= self.target,
+        }
+
+def parse_importtime(output: str) -> List[Tuple[str, float, float, int]]:
+    """(module, self ms, cumulative ms, depth) rows from -X importtime output"""
+    rows = []
+    for line in output.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((module, int(self_us) / 1000, int(cumulative_us) / 1000, (len(indent) - 1) // 2))
+    return rows
+
+def import_profile(module: str = 'app.main') -> List[Tuple[str, float, float, int]]:
+    """Import module in a fresh interpreter and return its import timings"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True, check=True
+    )
+    return parse_importtime(result.stderr)
+
+def main(top: int = IMPORT_REPORT_TOP) -> int:
+    rows = import_profile()
+    print("Slowest top-level imports (cumulative ms):")
+    for module, _, cumulative, _ in sorted((r for r in rows if r[3] <= 1), key=lambda r: -r[2])[:top]:
+        print(f"  {cumulative:8.1f}  {module}")
+
+    import asyncio
+    import app.main as server
+    asyncio.run(server.startup_event())
+
+    report = server.startup_profile.report()
+    print("Startup phases (ms):")
+    for name, ms in report["phases_ms"].items():
+        print(f"  {ms:8.1f}  {name}")
+    print(f"Cold start {report['total_ms']:.1f} ms (target {report['target_ms']:.1f} ms)")
+    return 0 if report["within_target"] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
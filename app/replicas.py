@@ -0,0 +1,201 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Tuple, Any, Optional, TypeVar
+import psycopg2
+from psycopg2.extensions import parse_dsn
+from psycopg2.pool import ThreadedConnectionPool, PoolError
+
+T = TypeVar('T')
+
+# Maximum pooled connections per replica
+REPLICA_POOL_SIZE = int(os.getenv('REPLICA_POOL_SIZE', '10'))
+# Seconds a failed replica is skipped before it is health checked again
+REPLICA_RETRY_SECONDS = float(os.getenv('REPLICA_RETRY_SECONDS', '30'))
+# Seconds between health checks of a replica that is in use
+HEALTH_CHECK_INTERVAL = float(os.getenv('REPLICA_HEALTH_CHECK_INTERVAL', '10'))
+# Replay lag above which a replica is taken out of rotation
+MAX_REPLICA_LAG = float(os.getenv('MAX_REPLICA_LAG', '30'))
+
+CONNECT_TIMEOUT = 3
+
+# Connection-level failures that make a read worth retrying elsewhere
+FAILOVER_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError)
+
+# Zero unless the server is a standby that has not replayed everything it received
+LAG_QUERY = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+_primary_reads: ContextVar[bool] = ContextVar('primary_reads', default=False)
+
+@contextmanager
+def primary_reads():
+    """Send reads inside the block to the primary (read-your-writes)"""
+    token = _primary_reads.set(True)
+    try:
+        yield
+    finally:
+        _primary_reads.reset(token)
+
+def reading_from_primary() -> bool:
+    return _primary_reads.get()
+
+class Replica:
+    """Connection pool and health state for one read replica"""
+
+    def __init__(self, dsn: str, pool_size: int = REPLICA_POOL_SIZE):
+        self.dsn = dsn
+        self.pool_size = pool_size
+        self.healthy = True
+        self.retry_at = 0.0
+        self.checked_at = 0.0
+        self.lag = 0.0
+        self.reads = 0
+        self.failures = 0
+        self._pool: Optional[ThreadedConnectionPool] = None
+        self._lock = threading.Lock()
+
+    @property
+    def name(self) -> str:
+        """host:port/dbname without credentials"""
+        params = parse_dsn(self.dsn)
+        return f"{params.get('host', 'localhost')}:{params.get('port', 5432)}/{params.get('dbname', '')}"
+
+    def _get_pool(self) -> ThreadedConnectionPool:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadedConnectionPool(0, self.pool_size, self.dsn, connect_timeout=CONNECT_TIMEOUT)
+            return self._pool
+
+    @contextmanager
+    def connection(self):
+        """Pooled read-only autocommit connection, discarded if it broke"""
+        pool = self._get_pool()
+        conn = pool.getconn()
+        try:
+            if not conn.autocommit:
+                conn.set_session(readonly=True, autocommit=True)
+            yield conn
+        except FAILOVER_ERRORS:
+            pool.putconn(conn, close=True)
+            raise
+        except Exception:
+            pool.putconn(conn)
+            raise
+        else:
+            pool.putconn(conn)
+
+    def close(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.closeall()
+
+    def mark_failed(self, retry_seconds: float):
+        self.healthy = False
+        self.retry_at = time.monotonic() + retry_seconds
+        self.failures += 1
+        # Pooled connections to a failed server are not worth keeping
+        self.close()
+
+    def check(self, max_lag: float) -> bool:
+        """Probe connectivity and replay lag"""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(LAG_QUERY)
+            self.lag = float(cursor.fetchone()[0])
+            cursor.close()
+        self.checked_at = time.monotonic()
+        self.healthy = self.lag <= max_lag
+        return self.healthy
+
+class ReplicaSet:
+    """Routes read-only queries across replicas with health checks
+
+    Replicas are tried round robin. A replica that fails a query or a
+    health check is skipped for retry_seconds and then probed before it
+    takes traffic again. When none can serve a read the caller falls back
+    to the primary.
+    """
+
+    def __init__(self, dsns: List[str], pool_size: int = REPLICA_POOL_SIZE,
+                 retry_seconds: float = REPLICA_RETRY_SECONDS,
+                 check_interval: float = HEALTH_CHECK_INTERVAL,
+                 max_lag: float = MAX_REPLICA_LAG):
+        self.replicas = [Replica(dsn, pool_size) for dsn in dsns if dsn]
+        self.retry_seconds = retry_seconds
+        self.check_interval = check_interval
+        self.max_lag = max_lag
+        self.primary_fallbacks = 0
+        self._next = 0
+
+    def __len__(self) -> int:
+        return len(self.replicas)
+
+    def _candidates(self) -> List[Replica]:
+        if not self.replicas:
+            return []
+        start = self._next % len(self.replicas)
+        self._next += 1
+        ordered = self.replicas[start:] + self.replicas[:start]
+        now = time.monotonic()
+        return [r for r in ordered if r.healthy or now >= r.retry_at]
+
+    def _ready(self, replica: Replica) -> bool:
+        """Health check replicas coming back from failure or due a periodic probe"""
+        if replica.healthy and time.monotonic() - replica.checked_at < self.check_interval:
+            return True
+        try:
+            if replica.check(self.max_lag):
+                return True
+        except PoolError:
+            return True  # every connection is busy serving reads
+        except FAILOVER_ERRORS as e:
+            print(f"Replica {replica.name} failed health check: {e}")
+        replica.mark_failed(self.retry_seconds)
+        return False
+
+    def run(self, fn: Callable[[Any], T]) -> Tuple[bool, Optional[T]]:
+        """Run fn(conn) on a healthy replica, (False, None) if none could"""
+        for replica in self._candidates():
+            if not self._ready(replica):
+                continue
+            try:
+                with replica.connection() as conn:
+                    result = fn(conn)
+            except PoolError:
+                continue  # exhausted, let another replica or the primary serve it
+            except FAILOVER_ERRORS as e:
+                print(f"Replica {replica.name} failed, failing over: {e}")
+                replica.mark_failed(self.retry_seconds)
+                continue
+            replica.reads += 1
+            return True, result
+        if self.replicas:
+            self.primary_fallbacks += 1
+        return False, None
+
+    def close(self):
+        for replica in self.replicas:
+            replica.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "replicas": [
+                {
+                    "name": r.name,
+                    "healthy": r.healthy,
+                    "lag_seconds": round(r.lag, 3),
+                    "reads": r.reads,
+                    "failures": r.failures,
+                }
+                for r in self.replicas
+            ],
+            "primary_fallbacks": self.primary_fallbacks,
+        }
@@ -0,0 +1,19 @@
+"""Training data maintenance, run periodically (e.g. daily cron)
+
+    python -m app.retention
+"""
+from app.db import init_db, ensure_training_partitions, drop_expired_training_partitions, delete_expired_synthetic_data
+
+def run_retention():
+    """Pre-create upcoming partitions and prune expired training data"""
+    init_db()
+    ensure_training_partitions()
+    
+    dropped = drop_expired_training_partitions()
+    print(f"Dropped {len(dropped)} expired partitions{': ' + ', '.join(dropped) if dropped else ''}")
+    
+    deleted = delete_expired_synthetic_data()
+    print(f"Deleted {deleted} expired synthetic rows")
+
+if __name__ == "__main__":
+    run_retention()
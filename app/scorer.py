@@ -0,0 +1,113 @@
+import os
+import numpy as np
+from typing import Dict, List, Any, Optional, Sequence
+
+SCORER_PATH = "app/scam_model.npz"
+
+# Bumped whenever the artifact layout changes
+ARTIFACT_VERSION = 2
+
+# Per input type feature schemas used by the type-specific models
+TYPE_FEATURES: Dict[str, List[str]] = {
+    'phone': [
+        'length', 'in_blacklist', 'blacklist_trust', 'is_premium', 'is_toll_free',
+        'is_shortcode', 'has_suspicious_pattern', 'repeated_digits', 'lookups_last_hour',
+    ],
+    'url': [
+        'length', 'in_blacklist', 'blacklist_trust', 'has_ip_address', 'has_suspicious_tld',
+        'is_https', 'subdomain_count', 'has_shortener', 'is_lookalike', 'brand_distance',
+        'lookups_last_hour',
+    ],
+    'sms': [
+        'length', 'has_url', 'has_phone', 'urgency_words', 'money_words',
+        'has_suspicious_keywords', 'template_similarity', 'lookups_last_hour',
+    ],
+    'file': [
+        'in_blacklist', 'blacklist_trust', 'is_apk', 'is_executable', 'is_unsigned',
+        'is_debug_signed', 'lookups_last_hour',
+    ],
+}
+
+def features_to_vector(features: Dict[str, Any], feature_names: Sequence[str]) -> np.ndarray:
+    """Convert feature dict to numpy vector in schema order"""
+    return np.array([float(features.get(name, 0) or 0) for name in feature_names])
+
+class LinearScorer:
+    """Scores feature dicts with exported logistic regression weights"""
+
+    def __init__(self, coef: np.ndarray, intercept: float, feature_names: Sequence[str]):
+        self.coef = np.asarray(coef, dtype=np.float64)
+        self.intercept = float(intercept)
+        self.feature_names = list(feature_names)
+
+    def predict_proba(self, features: Dict[str, Any]) -> float:
+        """Probability of the scam class for a single feature dict"""
+        z = float(np.dot(self.coef, features_to_vector(features, self.feature_names))) + self.intercept
+        return 0.5 * (1.0 + float(np.tanh(0.5 * z)))
+
+    def predict_proba_batch(self, features_list: List[Dict[str, Any]]) -> np.ndarray:
+        """Probability of the scam class for a batch of feature dicts"""
+        if not features_list:
+            return np.zeros(0)
+        X = np.stack([features_to_vector(f, self.feature_names) for f in features_list])
+        return 0.5 * (1.0 + np.tanh(0.5 * (X @ self.coef + self.intercept)))
+
+class ModelBundle:
+    """Versioned set of per input type scorers stored in one artifact"""
+
+    def __init__(self, scorers: Dict[str, LinearScorer], model_version: str = '',
+                 metrics: Optional[Dict[str, float]] = None):
+        self.scorers = dict(scorers)
+        self.model_version = model_version
+        self.metrics = dict(metrics or {})
+
+    @classmethod
+    def load(cls, path: str = SCORER_PATH) -> Optional["ModelBundle"]:
+        """Load bundle artifact, returns None if missing, unreadable or too new"""
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                if 'version' not in data or int(data['version']) != ARTIFACT_VERSION:
+                    return None
+                scorers = {}
+                metrics = {}
+                for input_type in data['input_types'].tolist():
+                    scorers[input_type] = LinearScorer(
+                        data[f'{input_type}_coef'],
+                        data[f'{input_type}_intercept'],
+                        data[f'{input_type}_feature_names'].tolist(),
+                    )
+                    metrics[input_type] = float(data[f'{input_type}_cv_score'])
+                return cls(scorers, str(data['model_version']), metrics)
+        except Exception:
+            return None
+
+    def save(self, path: str = SCORER_PATH):
+        """Write all scorers and the version stamp atomically"""
+        arrays = {
+            'version': np.array(ARTIFACT_VERSION),
+            'model_version': np.array(self.model_version),
+            'input_types': np.array(sorted(self.scorers)),
+        }
+        for input_type, scorer in self.scorers.items():
+            arrays[f'{input_type}_coef'] = scorer.coef
+            arrays[f'{input_type}_intercept'] = np.array(scorer.intercept)
+            arrays[f'{input_type}_feature_names'] = np.array(scorer.feature_names)
+            arrays[f'{input_type}_cv_score'] = np.array(self.metrics.get(input_type, float('nan')))
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+    def __contains__(self, input_type: str) -> bool:
+        return input_type in self.scorers
+
+    def __len__(self) -> int:
+        return len(self.scorers)
+
+    def predict_proba(self, input_type: str, features: Dict[str, Any]) -> Optional[float]:
+        """Scam probability from the input type's model, None if it has none"""
+        scorer = self.scorers.get(input_type)
+        if scorer is None:
+            return None
+        return scorer.predict_proba(features)
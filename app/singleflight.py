@@ -0,0 +1,69 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, Tuple, Any, TypeVar
+
+T = TypeVar('T')
+
+class _LeaderCancelled(Exception):
+    """Set on the shared future when the leader's own caller was cancelled"""
+
+class SingleFlight:
+    """Collapses concurrent calls with the same key into one execution
+
+    The first caller for a key runs the computation; callers arriving while
+    it is in flight await the same result (or exception). Nothing is cached
+    once the computation finishes. If the leader is cancelled, a waiting
+    follower runs the computation again rather than failing with it.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.executed = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """Return (result, shared) where shared is True for coalesced callers"""
+        self.calls += 1
+
+        while True:
+            future = self._in_flight.get(key)
+            if future is None:
+                break
+            try:
+                # Shield so a disconnecting follower cannot cancel the leader's work
+                result = await asyncio.shield(future)
+            except _LeaderCancelled:
+                # The first follower to wake becomes the new leader, the rest join it
+                continue
+            except Exception:
+                self.coalesced += 1
+                raise
+            self.coalesced += 1
+            return result, True
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        self.executed += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.set_exception(_LeaderCancelled())
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when there are no followers
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            del self._in_flight[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight),
+        }
@@ -0,0 +1,138 @@
+import re
+from typing import Dict, Any, Set, Tuple
+from app.analyzers import (
+    ScamAnalyzer, URGENCY_KEYWORDS, MONEY_KEYWORDS, SUSPICIOUS_KEYWORDS,
+    SMS_URL_PATTERN, SMS_PHONE_PATTERN,
+)
+from app.minhash import normalize_sms, shingles, SHINGLE_SIZE
+
+# Characters carried over between chunks so keywords, URLs and phone numbers
+# split across a chunk boundary are still seen. Must exceed the longest
+# keyword and the 10-digit phone pattern.
+TAIL_CHARS = 32
+
+MAX_CHUNK_CHARS = 4096
+
+# Currency marker that normalize_sms folds into a number after the whitespace
+_CURRENCY_END = re.compile(r'(rs\.?|inr|₹)\s*$')
+
+def _split_stable(text: str) -> Tuple[str, str]:
+    """Split off the last word, and any currency marker before it, as still incomplete
+
+    Normalizing the stable part on its own gives the same tokens as
+    normalizing it as part of the full text.
+    """
+    cut = len(text)
+    while cut:
+        cut = len(text[:cut].rstrip())
+        while cut and not text[cut - 1].isspace():
+            cut -= 1
+        if not _CURRENCY_END.search(text[max(0, cut - 8):cut].lower()):
+            break
+    return text[:cut], text[cut:]
+
+class StreamSession:
+    """Incremental SMS-thread / call-transcript scoring state
+
+    Each chunk is scanned together with a short tail of the previous text
+    only, and the template MinHash signature is folded in place, so work per
+    chunk is proportional to the chunk and memory per session is fixed.
+    """
+
+    def __init__(self, analyzer: ScamAnalyzer, mode: str = "balanced"):
+        self.analyzer = analyzer
+        self.mode = mode
+        self.chunks = 0
+        self.length = 0
+        self.tail = ''
+        # Raw text after the last word boundary, not yet normalized or shingled
+        self.pending = ''
+        # Last SHINGLE_SIZE characters of the normalized text shingled so far
+        self.norm_tail = ''
+        self.norm_length = 0
+        self.urgency: Set[str] = set()
+        self.money: Set[str] = set()
+        self.has_suspicious_keywords = False
+        self.has_url = False
+        self.has_phone = False
+        self.signature = analyzer.sms_index.hasher.empty()
+
+    def feed(self, chunk: str) -> Dict[str, Any]:
+        """Add a chunk of text and return the updated verdict"""
+        if len(chunk) > MAX_CHUNK_CHARS:
+            raise ValueError(f"Chunk exceeds {MAX_CHUNK_CHARS} characters")
+
+        window = self.tail + chunk
+        window_lower = window.lower()
+
+        self.urgency.update(kw for kw in URGENCY_KEYWORDS if kw in window_lower)
+        self.money.update(kw for kw in MONEY_KEYWORDS if kw in window_lower)
+        if not self.has_suspicious_keywords:
+            self.has_suspicious_keywords = any(kw in window_lower for kw in SUSPICIOUS_KEYWORDS)
+        if not self.has_url:
+            self.has_url = bool(SMS_URL_PATTERN.search(window))
+        if not self.has_phone:
+            self.has_phone = bool(SMS_PHONE_PATTERN.search(window))
+
+        stable, self.pending = _split_stable(self.pending + chunk)
+        if len(self.pending) > MAX_CHUNK_CHARS:
+            # One unbroken token this long is not text worth matching exactly
+            stable, self.pending = stable + self.pending, ''
+        self._fold(normalize_sms(stable))
+
+        self.chunks += 1
+        self.length += len(chunk)
+        self.tail = window[-TAIL_CHARS:]
+
+        return self.verdict()
+
+    def _join(self, text: str) -> Tuple[str, int]:
+        """Normalized tail joined with more normalized text, and the new total length"""
+        if not self.norm_length:
+            return text, len(text)
+        if not text:
+            return self.norm_tail, self.norm_length
+        return f"{self.norm_tail} {text}", self.norm_length + 1 + len(text)
+
+    def _fold(self, text: str):
+        """Shingle normalized text, including shingles spanning the previous tail"""
+        if not text:
+            return
+        joined, self.norm_length = self._join(text)
+        if len(joined) >= SHINGLE_SIZE:
+            self.analyzer.sms_index.hasher.update(self.signature, shingles(joined))
+        self.norm_tail = joined[-SHINGLE_SIZE:]
+
+    def _current_signature(self):
+        """Signature of everything fed so far, including the pending word"""
+        hasher = self.analyzer.sms_index.hasher
+        joined, length = self._join(normalize_sms(self.pending))
+        if length <= SHINGLE_SIZE:
+            # Short text is a single shingle, as for the whole message
+            return hasher.update(hasher.empty(), shingles(joined))
+        if self.pending:
+            return hasher.update(self.signature.copy(), shingles(joined))
+        return self.signature
+
+    def features(self) -> Dict[str, Any]:
+        """Current features in the shape produced by _extract_sms_features"""
+        features = {
+            'raw': self.tail,
+            'length': self.length,
+            'has_url': self.has_url,
+            'has_phone': self.has_phone,
+            'urgency_words': len(self.urgency),
+            'money_words': len(self.money),
+            'has_suspicious_keywords': self.has_suspicious_keywords,
+            'template_similarity': 0.0,
+            'lookups_last_hour': 0
+        }
+        if self.length and len(self.analyzer.sms_index):
+            features['template_similarity'], _ = self.analyzer.sms_index.query_signature(self._current_signature())
+        return features
+
+    def verdict(self) -> Dict[str, Any]:
+        result = self.analyzer.score_sms_features(self.features(), self.mode)
+        result['chunks'] = self.chunks
+        result['length'] = self.length
+        return result
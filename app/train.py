@@ -1,44 +1,101 @@
+import os
+import time
+import json
+import multiprocessing
 import numpy as np
 import joblib
+from concurrent.futures import ProcessPoolExecutor
 from sklearn.linear_model import LogisticRegression
-from sklearn.model_selection import train_test_split
-from typing import List, Dict, Any
-from app.db import get_training_data, add_training_data, init_db, seed_blacklist
+from sklearn.pipeline import Pipeline, make_pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.model_selection import StratifiedKFold, cross_val_score
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+from app.db import get_training_data, iter_training_data, add_training_data, init_db, seed_blacklist, primary_reads
+from app.scorer import features_to_vector, LinearScorer, ModelBundle, TYPE_FEATURES, SCORER_PATH
 
 MODEL_PATH = "app/scam_model.pkl"
 
-def synthesize_training_data():
-    """Create synthetic training examples"""
-    print("Synthesizing training data...")
-    
-    # Scam phone examples
-    scam_phones = [
+TRAINING_LIMIT = 1000
+# Types with fewer rows than this get synthetic examples
+MIN_TYPE_EXAMPLES = 8
+
+CV_FOLDS = 5
+CV_SCORING = 'roc_auc'
+
+# Candidate LogisticRegression settings evaluated per input type
+PARAM_GRID = [
+    {'C': C, 'class_weight': class_weight}
+    for C in (0.01, 0.1, 1.0, 10.0)
+    for class_weight in (None, 'balanced')
+]
+DEFAULT_PARAMS = {'C': 1.0, 'class_weight': None}
+
+SYNTHETIC_EXAMPLES = {
+    'phone': [
         ("+1-900-555-0199", "scam", {"length": 15, "is_premium": True, "in_blacklist": True}),
         ("+91-9000000000", "scam", {"length": 13, "has_suspicious_pattern": True, "repeated_digits": 10}),
         ("1900555", "scam", {"length": 7, "is_premium": True, "is_shortcode": False}),
         ("+1-888-SCAM-NOW", "likely_scam", {"length": 14, "in_blacklist": True}),
         ("9999999999", "scam", {"length": 10, "has_suspicious_pattern": True, "repeated_digits": 10}),
         ("+1-900-123-4567", "likely_scam", {"length": 15, "is_premium": True}),
-    ]
-    
-    # Benign phone examples
-    benign_phones = [
         ("+1-415-555-1234", "benign", {"length": 15, "is_valid": True, "is_premium": False}),
         ("+91-9876543210", "benign", {"length": 13, "is_valid": True, "is_premium": False}),
         ("+44-20-7946-0958", "benign", {"length": 16, "is_valid": True, "is_premium": False}),
         ("555-1234", "benign", {"length": 8, "is_shortcode": True}),
-    ]
+    ],
+    'url': [
+        ("http://phishing-site.com", "scam", {"length": 24, "in_blacklist": True, "blacklist_trust": 0.95}),
+        ("https://fake-bank-login.ru", "scam", {"length": 26, "in_blacklist": True, "has_suspicious_tld": True, "is_https": True}),
+        ("http://192.168.4.20/kyc-update", "scam", {"length": 30, "has_ip_address": True}),
+        ("bit.ly/scam123", "likely_scam", {"length": 14, "has_shortener": True, "in_blacklist": True}),
+        ("http://sbi-kyc.verify-now.tk", "scam", {"length": 28, "is_lookalike": True, "brand_distance": 0, "has_suspicious_tld": True, "subdomain_count": 1}),
+        ("https://www.google.com", "benign", {"length": 22, "is_https": True, "subdomain_count": 1}),
+        ("https://onlinesbi.sbi", "benign", {"length": 21, "is_https": True}),
+        ("https://www.amazon.in/orders", "benign", {"length": 28, "is_https": True, "subdomain_count": 1}),
+        ("https://github.com", "benign", {"length": 18, "is_https": True}),
+    ],
+    'sms': [
+        ("URGENT: your account is suspended, verify account now at http://sbi-kyc.tk", "scam",
+         {"length": 74, "has_url": True, "urgency_words": 2, "has_suspicious_keywords": True}),
+        ("Congratulations! You won a lottery prize of Rs 25 lakh, claim now: call 9876543210", "scam",
+         {"length": 83, "has_phone": True, "urgency_words": 1, "money_words": 3, "has_suspicious_keywords": True}),
+        ("Instant loan approved, cash credited in 10 min. Act now www.quickcash.in", "scam",
+         {"length": 72, "has_url": True, "urgency_words": 2, "money_words": 3}),
+        ("Play rummy and win cash daily, limited time bonus", "likely_scam",
+         {"length": 49, "urgency_words": 1, "money_words": 2, "has_suspicious_keywords": True}),
+        ("Hi, running 10 minutes late, see you at the station", "benign", {"length": 51}),
+        ("Your OTP for login is 482913. Do not share it with anyone.", "benign", {"length": 58}),
+        ("Mom: dinner at 8 tonight?", "benign", {"length": 25}),
+        ("Your order has been delivered. Thank you for shopping with us.", "benign", {"length": 62}),
+    ],
+    'file': [
+        ("update-kyc.apk", "scam", {"is_apk": True, "is_executable": True, "is_unsigned": True}),
+        ("bank-reward.apk", "scam", {"is_apk": True, "is_executable": True, "is_debug_signed": True}),
+        ("invoice.pdf.exe", "scam", {"is_executable": True, "in_blacklist": True, "blacklist_trust": 0.9}),
+        ("loan-approval.apk", "likely_scam", {"is_apk": True, "is_executable": True, "is_unsigned": True}),
+        ("report.pdf", "benign", {}),
+        ("photo.jpg", "benign", {}),
+        ("whatsapp.apk", "benign", {"is_apk": True, "is_executable": True}),
+        ("notes.txt", "benign", {}),
+    ],
+}
+
+def synthesize_training_data(input_types: Optional[Sequence[str]] = None):
+    """Create synthetic training examples for the given input types"""
+    print("Synthesizing training data...")
     
-    # Add to database
-    for phone, label, features in scam_phones + benign_phones:
-        try:
-            add_training_data("phone", phone, label, features, is_synthetic=True)
-        except:
-            pass  # May already exist
+    added = 0
+    for input_type in input_types or SYNTHETIC_EXAMPLES:
+        for value, label, features in SYNTHETIC_EXAMPLES.get(input_type, []):
+            try:
+                add_training_data(input_type, value, label, features, is_synthetic=True)
+                added += 1
+            except:
+                pass  # May already exist
     
-    print(f"Added {len(scam_phones) + len(benign_phones)} synthetic training examples")
+    print(f"Added {added} synthetic training examples")
 
-def prepare_features_and_labels(data: List[Dict[str, Any]]) -> tuple:
+def prepare_features_and_labels(data: List[Dict[str, Any]], feature_names: Sequence[str]) -> tuple:
     """Convert training data to feature vectors and labels"""
     X = []
     y = []
@@ -46,22 +103,10 @@ def prepare_features_and_labels(data: List[Dict[str, Any]]) -> tuple:
     for item in data:
         features = item.get('features', {})
         if isinstance(features, str):
-            import json
             features = json.loads(features)
         
-        # Convert features to vector (must match _features_to_vector in analyzers.py)
-        vector = [
-            float(features.get('length', 0)),
-            float(features.get('in_blacklist', False)),
-            float(features.get('blacklist_trust', 0.0)),
-            float(features.get('is_premium', False)),
-            float(features.get('is_shortcode', False)),
-            float(features.get('has_suspicious_pattern', False)),
-            float(features.get('repeated_digits', 0)),
-            float(features.get('has_url', False)),
-            float(features.get('urgency_words', 0)),
-            float(features.get('money_words', 0)),
-        ]
+        # Convert features to vector in the exported schema order
+        vector = features_to_vector(features or {}, feature_names)
         
         X.append(vector)
         
@@ -69,64 +114,127 @@ def prepare_features_and_labels(data: List[Dict[str, Any]]) -> tuple:
         label = item.get('label', 'benign')
         y.append(1 if label in ['scam', 'likely_scam'] else 0)
     
-    return np.array(X), np.array(y)
+    return np.array(X).reshape(len(X), len(feature_names)), np.array(y)
+
+def _new_model(params: Dict[str, Any]) -> Pipeline:
+    # Standardized inputs keep C comparable across features like raw length
+    return make_pipeline(StandardScaler(), LogisticRegression(random_state=42, max_iter=1000, solver='lbfgs', **params))
+
+def to_scorer(model: Pipeline, feature_names: Sequence[str]) -> LinearScorer:
+    """Fold the scaler into the regression weights so serving needs no sklearn"""
+    scaler, regression = model[0], model[-1]
+    coef = regression.coef_[0] / scaler.scale_
+    intercept = regression.intercept_[0] - float(np.dot(coef, scaler.mean_))
+    return LinearScorer(coef, intercept, feature_names)
+
+def cross_validate(X: np.ndarray, y: np.ndarray, params: Dict[str, Any], folds: int) -> float:
+    """Mean stratified k-fold score of one candidate (runs in a worker process)"""
+    cv = StratifiedKFold(n_splits=folds, shuffle=True, random_state=42)
+    return float(cross_val_score(_new_model(params), X, y, cv=cv, scoring=CV_SCORING).mean())
 
-def train_model():
-    """Train logistic regression model"""
-    print("Training scam detection model...")
+def _pool_context():
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+def search_hyperparameters(datasets: Dict[str, Tuple[np.ndarray, np.ndarray]],
+                           workers: Optional[int] = None) -> Dict[str, Tuple[Dict[str, Any], float]]:
+    """Best (params, cv score) per input type
+    
+    Every (type, candidate) pair is an independent job, so all of them are
+    submitted to one process pool and training time shrinks with cores.
+    Types whose smaller class has fewer than two rows cannot be
+    cross-validated and get the default parameters.
+    """
+    jobs = []
+    best: Dict[str, Tuple[Dict[str, Any], float]] = {}
+    for input_type, (X, y) in datasets.items():
+        folds = min(CV_FOLDS, int(np.bincount(y, minlength=2).min()))
+        if folds < 2:
+            best[input_type] = (DEFAULT_PARAMS, float('nan'))
+            continue
+        jobs.extend((input_type, params, X, y, folds) for params in PARAM_GRID)
+    
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(jobs) > 1:
+        # Training also runs on a server thread; forking that multi-threaded
+        # process can copy held locks, so workers start from a clean interpreter
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), mp_context=_pool_context()) as pool:
+            futures = [pool.submit(cross_validate, X, y, params, folds) for _, params, X, y, folds in jobs]
+            scores = [future.result() for future in futures]
+    else:
+        scores = [cross_validate(X, y, params, folds) for _, params, X, y, folds in jobs]
+    
+    # Ties keep the earlier, more regularized candidate
+    for (input_type, params, _, _, _), score in zip(jobs, scores):
+        if input_type not in best or score > best[input_type][1]:
+            best[input_type] = (params, score)
+    return best
+
+def train_type_models(datasets: Dict[str, Tuple[np.ndarray, np.ndarray]],
+                      workers: Optional[int] = None) -> Tuple[ModelBundle, Dict[str, Pipeline]]:
+    """Select hyperparameters and fit one model per input type"""
+    usable = {t: (X, y) for t, (X, y) in datasets.items() if len(np.unique(y)) == 2}
+    for input_type in sorted(set(datasets) - set(usable)):
+        print(f"Skipping {input_type}: training data has a single class")
+    
+    best = search_hyperparameters(usable, workers)
+    
+    models = {}
+    scorers = {}
+    metrics = {}
+    for input_type, (X, y) in usable.items():
+        params, score = best[input_type]
+        models[input_type] = _new_model(params).fit(X, y)
+        scorers[input_type] = to_scorer(models[input_type], TYPE_FEATURES[input_type])
+        metrics[input_type] = score
+        print(f"{input_type}: {len(X)} examples, params {params}, cv {CV_SCORING} {score:.3f}")
+    
+    model_version = time.strftime('%Y%m%dT%H%M%SZ', time.gmtime())
+    return ModelBundle(scorers, model_version, metrics), models
+
+def load_datasets() -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """Feature matrices per input type, synthesizing rows for sparse types"""
+    counts = {t: len(get_training_data(t, limit=MIN_TYPE_EXAMPLES)) for t in TYPE_FEATURES}
+    sparse = [t for t, count in counts.items() if count < MIN_TYPE_EXAMPLES]
+    if sparse:
+        print(f"Too few training examples for {', '.join(sparse)}, synthesizing more...")
+        synthesize_training_data(sparse)
+    
+    return {
+        input_type: prepare_features_and_labels(list(iter_training_data(input_type, limit=TRAINING_LIMIT)), feature_names)
+        for input_type, feature_names in TYPE_FEATURES.items()
+    }
+
+def train_model(workers: Optional[int] = None) -> Optional[ModelBundle]:
+    """Train per input type logistic regression models"""
+    print("Training scam detection models...")
     
     # Initialize database and seed data
     init_db()
     seed_blacklist()
     
-    # Get training data
-    data = get_training_data()
-    
-    # If insufficient data, synthesize some
-    if len(data) < 10:
-        print(f"Only {len(data)} training examples found, synthesizing more...")
-        synthesize_training_data()
-        data = get_training_data()
-    
-    print(f"Training on {len(data)} examples...")
+    start = time.time()
+    # Synthetic rows were just written to the primary; replicas may lag
+    with primary_reads():
+        datasets = load_datasets()
+    bundle, models = train_type_models(datasets, workers)
     
-    # Prepare features and labels
-    X, y = prepare_features_and_labels(data)
-    
-    if len(X) < 4:
+    if not len(bundle):
         print("Insufficient training data even after synthesis!")
         return None
     
-    # Train simple logistic regression (small model, fast)
-    model = LogisticRegression(
-        random_state=42,
-        max_iter=1000,
-        solver='lbfgs',
-        C=1.0
-    )
-    
-    # If enough data, do train/test split
-    if len(X) >= 10:
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.2, random_state=42
-        )
-        model.fit(X_train, y_train)
-        score = model.score(X_test, y_test)
-        print(f"Model accuracy on test set: {score:.2%}")
-    else:
-        model.fit(X, y)
-        print("Trained on all data (small dataset)")
+    print(f"Trained {len(bundle)} models in {time.time() - start:.1f}s")
     
-    # Save model
-    joblib.dump(model, MODEL_PATH)
-    print(f"Model saved to {MODEL_PATH}")
+    # Save fitted estimators for offline inspection
+    joblib.dump(models, MODEL_PATH)
+    print(f"Models saved to {MODEL_PATH}")
     
-    # Print model size
-    import os
-    model_size = os.path.getsize(MODEL_PATH) / 1024  # KB
-    print(f"Model size: {model_size:.2f} KB")
+    # Export lightweight bundle used on the serving path
+    bundle.save(SCORER_PATH)
+    model_size = os.path.getsize(SCORER_PATH) / 1024  # KB
+    print(f"Model bundle {bundle.model_version} exported to {SCORER_PATH} ({model_size:.2f} KB)")
     
-    return model
+    return bundle
 
 if __name__ == "__main__":
     train_model()
@@ -0,0 +1,110 @@
+import hashlib
+import os
+import tempfile
+import threading
+import time
+import numpy as np
+from typing import Optional
+
+VELOCITY_PATH = "app/velocity.npz"
+
+BUCKET_SECONDS = 300
+NUM_BUCKETS = 12  # one hour window
+SKETCH_WIDTH = 1 << 14
+SKETCH_DEPTH = 4
+SNAPSHOT_INTERVAL = 60
+
+class VelocityTracker:
+    """Sliding-window lookup counts from time-bucketed count-min sketches
+
+    Memory is fixed at NUM_BUCKETS x SKETCH_DEPTH x SKETCH_WIDTH counters no
+    matter how many distinct indicators are seen. Estimates never undercount.
+    """
+
+    def __init__(self, width: int = SKETCH_WIDTH, depth: int = SKETCH_DEPTH,
+                 bucket_seconds: int = BUCKET_SECONDS, num_buckets: int = NUM_BUCKETS,
+                 snapshot_path: Optional[str] = None):
+        self.width = width
+        self.depth = depth
+        self.bucket_seconds = bucket_seconds
+        self.num_buckets = num_buckets
+        self.snapshot_path = snapshot_path
+        self.counts = np.zeros((num_buckets, depth, width), dtype=np.uint32)
+        # Epoch (time // bucket_seconds) currently held by each slot
+        self.epochs = np.full(num_buckets, -1, dtype=np.int64)
+        self._rows = np.arange(depth)
+        self._lock = threading.Lock()
+        self._last_snapshot = time.time()
+
+    @classmethod
+    def load(cls, path: str = VELOCITY_PATH) -> "VelocityTracker":
+        """Restore from a snapshot, or start empty if none is usable"""
+        tracker = cls(snapshot_path=path)
+        if os.path.exists(path):
+            try:
+                with np.load(path) as data:
+                    counts, epochs = data['counts'], data['epochs']
+                    if counts.shape == tracker.counts.shape and int(data['bucket_seconds']) == tracker.bucket_seconds:
+                        tracker.counts = counts.astype(np.uint32)
+                        tracker.epochs = epochs.astype(np.int64)
+            except Exception:
+                pass
+        return tracker
+
+    def save(self, path: Optional[str] = None):
+        """Write the sketches to disk atomically"""
+        path = path or self.snapshot_path
+        if not path:
+            return
+        with self._lock:
+            counts, epochs = self.counts.copy(), self.epochs.copy()
+            self._last_snapshot = time.time()
+        # Unique temp name: a periodic snapshot and shutdown may overlap
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, counts=counts, epochs=epochs, bucket_seconds=np.array(self.bucket_seconds))
+        os.replace(tmp_path, path)
+
+    def _columns(self, key: str) -> np.ndarray:
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=4 * self.depth).digest()
+        return np.frombuffer(digest, dtype=np.uint32) % self.width
+
+    def _estimate(self, columns: np.ndarray, epoch: int) -> int:
+        live = np.flatnonzero((self.epochs > epoch - self.num_buckets) & (self.epochs <= epoch))
+        if not live.size:
+            return 0
+        # Gather only depth counters per live bucket rather than whole sketches
+        per_row = self.counts[live[:, None], self._rows, columns].sum(axis=0, dtype=np.int64)
+        return int(per_row.min())
+
+    def record(self, key: str, now: Optional[float] = None) -> int:
+        """Count one lookup of key and return its count over the window"""
+        now = time.time() if now is None else now
+        epoch = int(now // self.bucket_seconds)
+        slot = epoch % self.num_buckets
+        columns = self._columns(key)
+
+        with self._lock:
+            if self.epochs[slot] != epoch:
+                # Slot still holds an expired bucket
+                self.counts[slot] = 0
+                self.epochs[slot] = epoch
+            self.counts[slot, self._rows, columns] += 1
+            estimate = self._estimate(columns, epoch)
+            snapshot_due = self.snapshot_path and now - self._last_snapshot >= SNAPSHOT_INTERVAL
+            if snapshot_due:
+                # Claim the snapshot so concurrent lookups do not all write one
+                self._last_snapshot = now
+
+        if snapshot_due:
+            try:
+                self.save()
+            except OSError:
+                pass
+        return estimate
+
+    def estimate(self, key: str, now: Optional[float] = None) -> int:
+        """Lookups of key over the window without counting a new one"""
+        now = time.time() if now is None else now
+        with self._lock:
+            return self._estimate(self._columns(key), int(now // self.bucket_seconds))
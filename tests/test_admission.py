@@ -0,0 +1,40 @@
+import asyncio
+import threading
+import pytest
+from app.admission import AdmissionController, Overloaded
+
+def test_runs_normally_under_low_load():
+    """Requests below thresholds take the full path"""
+    controller = AdmissionController(degrade_in_flight=2, reject_in_flight=4)
+    assert asyncio.run(controller.run(lambda degraded: degraded)) is False
+    assert controller.stats()["admitted"] == 1
+    assert controller.in_flight == 0
+
+def test_degrades_then_rejects_when_saturated():
+    """Excess concurrency degrades first and rejects only past the hard limit"""
+    controller = AdmissionController(degrade_in_flight=2, reject_in_flight=4, degrade_queue_delay=10)
+    release = threading.Event()
+
+    def work(degraded):
+        release.wait(5)
+        return degraded
+
+    async def scenario():
+        tasks = [asyncio.ensure_future(controller.run(work)) for _ in range(4)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(Overloaded):
+            await controller.run(work)
+        release.set()
+        return await asyncio.gather(*tasks)
+
+    results = asyncio.run(scenario())
+    assert results == [False, False, True, True]
+    stats = controller.stats()
+    assert stats["degraded"] == 2
+    assert stats["rejected"] == 1
+
+def test_degrades_on_queue_delay():
+    """High smoothed queueing delay triggers the degraded path"""
+    controller = AdmissionController(degrade_queue_delay=0.05)
+    controller.queue_delay = 0.5
+    assert asyncio.run(controller.run(lambda degraded: degraded)) is True
@@ -0,0 +1,85 @@
+from datetime import date, datetime
+import pytest
+from app.db import (
+    PARTITION_MONTHS_AHEAD, _month_start, init_db, get_db_connection, get_schema_version, get_training_data, iter_training_data,
+    add_training_data, ensure_training_partitions, drop_expired_training_partitions, MIGRATIONS,
+)
+
+TEST_TYPE = "test_keyset"
+
+@pytest.fixture(scope="module")
+def rows():
+    """Twelve training rows of a dedicated type, removed afterwards"""
+    init_db()
+    for i in range(12):
+        add_training_data(TEST_TYPE, f"row-{i}", "benign", {"i": i})
+    yield
+    with get_db_connection() as conn:
+        conn.cursor().execute("DELETE FROM training_data WHERE type = %s", (TEST_TYPE,))
+
+def test_migrations_are_recorded_and_idempotent():
+    init_db()
+    init_db()
+    assert get_schema_version() == MIGRATIONS[-1][0]
+
+def test_training_data_is_partitioned_and_indexed():
+    init_db()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT relkind FROM pg_class WHERE relname = 'training_data'")
+        assert cursor.fetchone()[0] == 'p'
+        cursor.execute("SELECT indexdef FROM pg_indexes WHERE tablename = 'training_data'")
+        indexes = " ".join(row[0] for row in cursor.fetchall())
+    assert "(type, created_at DESC, id DESC)" in indexes
+
+def test_keyset_pages_cover_all_rows_once(rows):
+    """Small batches return every row exactly once, newest first"""
+    streamed = list(iter_training_data(TEST_TYPE, batch_size=5))
+    assert [r['input_raw'] for r in streamed] == [f"row-{i}" for i in range(11, -1, -1)]
+
+    first = get_training_data(TEST_TYPE, limit=4)
+    second = get_training_data(TEST_TYPE, limit=4, after=(first[-1]['created_at'], first[-1]['id']))
+    assert [r['input_raw'] for r in second] == ["row-7", "row-6", "row-5", "row-4"]
+
+def test_iter_respects_limit(rows):
+    assert len(list(iter_training_data(TEST_TYPE, batch_size=5, limit=7))) == 7
+
+def test_expired_partitions_are_dropped():
+    """Retention drops whole months past the window and keeps recent ones"""
+    init_db()
+    ensure_training_partitions(months_ahead=0, today=date(2001, 1, 15))
+    with get_db_connection() as conn:
+        conn.cursor().execute("""
+            INSERT INTO training_data (type, input_raw, label, created_at)
+            VALUES (%s, 'old', 'benign', %s)
+        """, (TEST_TYPE, datetime(2001, 1, 20)))
+
+    dropped = drop_expired_training_partitions(retention_months=24)
+    assert "training_data_2001_01" in dropped
+    assert f"training_data_{date.today():%Y_%m}" not in dropped
+    assert all(r['input_raw'] != 'old' for r in get_training_data(TEST_TYPE))
+
+def test_init_db_moves_default_partition_rows():
+    """A month whose rows already landed in the default partition is created on startup"""
+    init_db()
+    month = _month_start(date.today(), PARTITION_MONTHS_AHEAD)
+    name = f"training_data_{month:%Y_%m}"
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"DROP TABLE IF EXISTS {name}")
+        cursor.execute("""
+            INSERT INTO training_data (type, input_raw, label, created_at)
+            VALUES (%s, 'future', 'benign', %s)
+        """, (TEST_TYPE, datetime(month.year, month.month, 3)))
+        cursor.execute("SELECT tableoid::regclass::text FROM training_data WHERE input_raw = 'future'")
+        assert cursor.fetchone()[0] == "training_data_default"
+
+    try:
+        init_db()
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT tableoid::regclass::text FROM training_data WHERE input_raw = 'future'")
+            assert cursor.fetchone()[0] == name
+    finally:
+        with get_db_connection() as conn:
+            conn.cursor().execute("DELETE FROM training_data WHERE input_raw = 'future'")
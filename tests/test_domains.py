@@ -0,0 +1,89 @@
+import pytest
+from app import domains
+from app.analyzers import ScamAnalyzer
+from app.db import init_db
+from app.domains import BrandIndex, skeleton
+
+@pytest.fixture(scope="module")
+def brand_index():
+    return BrandIndex()
+
+def test_brand_token_on_unofficial_domain(brand_index):
+    """Brand name in a hyphenated token is flagged"""
+    match = brand_index.match("http://sbi-netbanking.co/login")
+    assert match["brand"] == "sbi"
+    assert match["distance"] == 0
+
+def test_typosquat_within_edit_distance(brand_index):
+    """Single-character typo of a long brand is flagged"""
+    match = brand_index.match("https://www.icicibamk.in")
+    assert match["brand"] == "icicibank"
+    assert match["distance"] == 1
+
+def test_homoglyph_and_punycode(brand_index):
+    """Cyrillic and digit substitutions collapse to the brand skeleton"""
+    assert brand_index.match("https://xn--pytm-53d.com")["brand"] == "paytm"
+    assert brand_index.match("https://amaz0n-offers.in")["brand"] == "amazon"
+    assert skeleton("paytrn") == skeleton("paytm")
+
+def test_official_domains_not_flagged(brand_index):
+    """Official brand domains and their subdomains pass"""
+    assert brand_index.match("https://www.onlinesbi.sbi/") is None
+    assert brand_index.match("https://secure.sbi.co.in/x") is None
+    assert brand_index.match("https://google.com/search") is None
+
+def test_unrelated_domains_not_flagged(brand_index):
+    """Unrelated hosts and IP addresses do not match"""
+    assert brand_index.match("https://example.org") is None
+    assert brand_index.match("http://192.168.1.1/x") is None
+
+def test_short_brands_need_exact_or_homoglyph_match(brand_index):
+    """Ordinary words one edit from a short brand are not lookalikes"""
+    assert brand_index.match("https://apply-online.in") is None
+    assert brand_index.match("https://kodak.com") is None
+    assert brand_index.match("https://app1e-id.com")["brand"] == "apple"
+    assert brand_index.match("https://kotak-kyc.in")["distance"] == 0
+
+def test_long_labels_not_expanded(brand_index, monkeypatch):
+    """Labels too long to be within tolerance of any brand skip the deletion lookup"""
+    expanded = []
+    original = domains._deletes
+    monkeypatch.setattr(domains, '_deletes', lambda word, depth: expanded.append(word) or original(word, depth))
+    label = 'q' * 63
+    assert brand_index.match(f"https://{label}.com") is None
+    assert brand_index.match(f"https://{label}-sbi.com")["brand"] == "sbi"
+    assert label not in expanded
+    assert expanded == [skeleton('sbi')]
+
+@pytest.mark.parametrize("url", [
+    "https://www.google-analytics.com",
+    "https://www.whatsapp.net",
+    "https://www.amazon.co.uk/orders",
+    "https://www.facebook.net",
+])
+def test_brand_owned_domains_not_flagged(brand_index, url):
+    """Brand service domains and the brand under another suffix pass"""
+    assert brand_index.match(url) is None
+
+def test_homoglyph_match_marked(brand_index):
+    """Skeleton-equal labels that are not the literal brand are homoglyphs"""
+    assert brand_index.match("https://www.npcl.co.in")["homoglyph"] is True
+    assert brand_index.match("https://sbi-netbanking.co/login")["homoglyph"] is False
+
+@pytest.fixture(scope="module")
+def analyzer():
+    init_db()
+    return ScamAnalyzer()
+
+@pytest.mark.parametrize("url", ["https://www.google-analytics.com", "https://www.amazon.co.uk/orders"])
+def test_brand_owned_domains_not_scored_as_lookalikes(analyzer, url):
+    for mode in ("heuristic", "balanced"):
+        result = analyzer.analyze("url", url, mode)
+        assert result["label"] not in ("scam", "likely_scam")
+        assert not any("brand" in reason for reason in result["explain"])
+
+def test_homoglyph_reason_wording(analyzer):
+    """A confusable match is not described as literal brand use"""
+    explain = analyzer.analyze("url", "https://www.npcl.co.in", "heuristic")["explain"]
+    assert "Imitates brand 'npci' with lookalike characters" in explain
+    assert not any(reason.startswith("Uses brand name") for reason in explain)
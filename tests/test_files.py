@@ -0,0 +1,172 @@
+import hashlib
+import struct
+import zipfile
+import numpy as np
+import pytest
+from app.analyzers import ScamAnalyzer
+from app.db import init_db
+from app.files import StreamingHasher, inspect_apk, hash_and_inspect
+from app.scorer import LinearScorer, ModelBundle, TYPE_FEATURES
+
+def _axml(strings):
+    """Build a minimal binary XML document holding a UTF-16 string pool"""
+    encoded = [struct.pack('<H', len(s)) + s.encode('utf-16-le') + b'\x00\x00' for s in strings]
+    offsets, pos = [], 0
+    for e in encoded:
+        offsets.append(pos)
+        pos += len(e)
+    header_size = 28
+    strings_start = header_size + 4 * len(strings)
+    body = struct.pack(f'<{len(strings)}I', *offsets) + b''.join(encoded)
+    pool = struct.pack('<HHIIIIII', 0x0001, header_size, header_size + len(body),
+                       len(strings), 0, 0, strings_start, 0) + body
+    return struct.pack('<HHI', 0x0003, 8, 8 + len(pool)) + pool
+
+def _write_apk(path, signed=True, debug=False):
+    with zipfile.ZipFile(path, 'w') as zf:
+        zf.writestr('AndroidManifest.xml', _axml([
+            'manifest', 'com.example.app',
+            'android.permission.INTERNET',
+            'android.permission.READ_SMS',
+            'android.permission.SEND_SMS',
+        ]))
+        zf.writestr('classes.dex', b'dex\n035\x00')
+        zf.writestr('classes2.dex', b'dex\n035\x00')
+        if signed:
+            zf.writestr('META-INF/CERT.RSA', b'\x30\x82' + (b'CN=Android Debug' if debug else b'CN=Example'))
+
+def test_streaming_hasher_matches_hashlib():
+    """Chunked hashing equals hashing the whole payload"""
+    data = b'scam' * 100000
+    hasher = StreamingHasher(('sha256', 'md5', 'sha1'))
+    for i in range(0, len(data), 4096):
+        hasher.update(data[i:i + 4096])
+    digests = hasher.hexdigests()
+    assert digests['sha256'] == hashlib.sha256(data).hexdigest()
+    assert digests['md5'] == hashlib.md5(data).hexdigest()
+    assert digests['sha1'] == hashlib.sha1(data).hexdigest()
+    assert hasher.size == len(data)
+
+def test_inspect_apk_permissions_and_signature(tmp_path):
+    """Manifest permissions, dex count and signing info are extracted"""
+    path = tmp_path / 'app.apk'
+    _write_apk(path, debug=True)
+    info = inspect_apk(str(path))
+    assert info['is_valid_zip']
+    assert info['dex_count'] == 2
+    assert info['has_manifest']
+    assert 'android.permission.INTERNET' in info['permissions']
+    assert info['dangerous_permissions'] == ['android.permission.READ_SMS', 'android.permission.SEND_SMS']
+    assert info['is_signed']
+    assert info['is_debug_signed']
+
+def test_inspect_unsigned_apk(tmp_path):
+    """APK without META-INF signature files is reported unsigned"""
+    path = tmp_path / 'app.apk'
+    _write_apk(path, signed=False)
+    info = inspect_apk(str(path))
+    assert not info['is_signed']
+    assert info['signature_files'] == []
+
+def test_inspect_non_zip(tmp_path):
+    """Non-archive input is reported as invalid rather than raising"""
+    path = tmp_path / 'app.apk'
+    path.write_bytes(b'not a zip file')
+    assert inspect_apk(str(path))['is_valid_zip'] is False
+
+def _corrupt_apk(path, corrupt):
+    """Deflated APK whose manifest member is then damaged by corrupt(bytearray, info)"""
+    with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr('AndroidManifest.xml', _axml(['manifest', 'android.permission.READ_SMS']))
+        zf.writestr('META-INF/CERT.RSA', b'\x30\x82CN=Example')
+    with zipfile.ZipFile(path) as zf:
+        info = zf.getinfo('AndroidManifest.xml')
+    data = bytearray(path.read_bytes())
+    corrupt(data, info)
+    path.write_bytes(bytes(data))
+
+def test_inspect_corrupt_deflate_stream(tmp_path):
+    """A damaged compressed manifest is recorded, not raised"""
+    def garble(data, info):
+        start = info.header_offset + 30 + len(info.filename)
+        data[start:start + info.compress_size] = b'\xff' * info.compress_size
+    path = tmp_path / "corrupt.apk"
+    _corrupt_apk(path, garble)
+    info = inspect_apk(str(path))
+    assert info['manifest_unreadable'] is True
+    assert info['permissions'] == []
+    assert info['is_signed'] is True
+
+def test_inspect_unknown_compression_method(tmp_path):
+    def unknown_method(data, info):
+        central = data.rindex(b'PK\x01\x02', 0, data.rindex(b'PK\x01\x02'))
+        struct.pack_into('<H', data, central + 10, 99)
+    path = tmp_path / "method.apk"
+    _corrupt_apk(path, unknown_method)
+    assert inspect_apk(str(path))['manifest_unreadable'] is True
+
+def test_inspect_crc_mismatch(tmp_path):
+    def bad_crc(data, info):
+        central = data.rindex(b'PK\x01\x02', 0, data.rindex(b'PK\x01\x02'))
+        struct.pack_into('<I', data, central + 16, info.CRC ^ 0xFFFFFFFF)
+    path = tmp_path / "crc.apk"
+    _corrupt_apk(path, bad_crc)
+    assert inspect_apk(str(path))['manifest_unreadable'] is True
+
+def test_hash_and_inspect_stream(tmp_path):
+    """Uploads are hashed in full and only ZIPs are inspected"""
+    import io
+    path = tmp_path / "app.apk"
+    _write_apk(path)
+    payload = path.read_bytes()
+    hashes, apk_info = hash_and_inspect(io.BytesIO(payload), ('sha256', 'md5'))
+    assert hashes == {'sha256': hashlib.sha256(payload).hexdigest(), 'md5': hashlib.md5(payload).hexdigest()}
+    assert apk_info['is_valid_zip'] is True
+
+    hashes, apk_info = hash_and_inspect(io.BytesIO(b'plain text'))
+    assert hashes['sha256'] == hashlib.sha256(b'plain text').hexdigest()
+    assert apk_info is None
+
+@pytest.fixture(scope="module")
+def analyzer():
+    init_db()
+    return ScamAnalyzer()
+
+def test_analyze_upload_uses_file_model(analyzer, monkeypatch):
+    """Uploads are scored by the file model like hash lookups"""
+    names = TYPE_FEATURES['file']
+    monkeypatch.setattr(analyzer, 'model', ModelBundle({'file': LinearScorer(np.zeros(len(names)), 2.0, names)}))
+
+    hashes = {'sha256': hashlib.sha256(b'notes').hexdigest()}
+    result = analyzer.analyze_upload('notes.txt', hashes, None, 'balanced')
+    assert 'ml' in result['used_methods']
+    assert any(reason.startswith('ML model prediction') for reason in result['explain'])
+
+    heuristic = analyzer.analyze_upload('notes.txt', hashes, None, 'heuristic')
+    assert 'ml' not in heuristic['used_methods']
+    assert result['confidence'] > heuristic['confidence']
+
+@pytest.mark.parametrize("filename", ["report.docx", "photos.zip"])
+def test_office_and_plain_zips_not_treated_as_apk(analyzer, tmp_path, filename):
+    """ZIP containers without a manifest or dex code are not APKs"""
+    path = tmp_path / filename
+    with zipfile.ZipFile(path, 'w') as zf:
+        zf.writestr('[Content_Types].xml', b'<Types/>')
+        zf.writestr('word/document.xml', b'<w:document/>')
+    with open(path, 'rb') as f:
+        hashes, apk_info = hash_and_inspect(f)
+    assert apk_info is not None
+
+    result = analyzer.analyze_upload(filename, hashes, apk_info, 'heuristic')
+    assert result['label'] not in ('scam', 'likely_scam')
+    assert not any('APK' in reason or 'Executable' in reason for reason in result['explain'])
+
+def test_unsigned_apk_contents_flagged_without_suffix(analyzer, tmp_path):
+    """A real APK is recognised by its contents even when renamed"""
+    path = tmp_path / 'invoice.zip'
+    _write_apk(path, signed=False)
+    with open(path, 'rb') as f:
+        hashes, apk_info = hash_and_inspect(f)
+    result = analyzer.analyze_upload('invoice.zip', hashes, apk_info, 'heuristic')
+    assert "APK is not signed" in result['explain']
+    assert result['label'] in ('scam', 'likely_scam')
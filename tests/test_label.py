@@ -0,0 +1,27 @@
+import pytest
+from fastapi.testclient import TestClient
+from app import main
+
+SMS = {"sms": "Your account is blocked, verify at http://kyc-upd.in", "label": "scam"}
+
+@pytest.fixture
+def client():
+    # No lifespan: the admin check runs before the analyzer is needed
+    return TestClient(main.app)
+
+def test_label_disabled_without_admin_token(client, monkeypatch):
+    """Labelling is off unless an admin token is configured"""
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "")
+    assert client.post("/label/sms", json=SMS, headers={"X-Admin-Token": ""}).status_code == 403
+
+def test_label_requires_admin_token(client, monkeypatch):
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "s3cret")
+    assert client.post("/label/sms", json=SMS).status_code == 401
+    assert client.post("/label/sms", json=SMS, headers={"X-Admin-Token": "guess"}).status_code == 401
+
+def test_label_with_admin_token(client, monkeypatch):
+    """A valid token reaches the handler"""
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "s3cret")
+    monkeypatch.setattr(main, "analyzer", None)
+    response = client.post("/label/sms", json=SMS, headers={"X-Admin-Token": "s3cret"})
+    assert response.status_code == 503
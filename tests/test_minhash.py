@@ -0,0 +1,83 @@
+import pickle
+import threading
+from app.minhash import MinHashIndex, normalize_sms
+
+KYC_TEMPLATE = "Dear Ramesh, your SBI account will be blocked today. Update KYC at http://sbi-kyc.in/a12 or call 9876543210"
+
+def test_normalize_masks_variable_parts():
+    """Amounts, links and numbers are masked"""
+    text = normalize_sms("You won Rs.5,000! Claim at https://bit.ly/x9 now")
+    assert "<num>" in text
+    assert "<url>" in text
+    assert "5" not in text
+
+def test_campaign_variant_matches_template():
+    """Variant with different name, link and number matches the template"""
+    index = MinHashIndex()
+    index.insert("kyc", KYC_TEMPLATE)
+    variant = "Dear Suresh, your SBI account will be blocked today. Update KYC at http://sbi-verify.co/zz or call 9123456780"
+    score, key = index.query(variant)
+    assert key == "kyc"
+    assert score >= 0.8
+
+def test_unrelated_message_does_not_match():
+    """Legitimate message has low similarity"""
+    index = MinHashIndex()
+    index.insert("kyc", KYC_TEMPLATE)
+    score, _ = index.query("Your package will be delivered tomorrow between 2-4 PM.")
+    assert score < 0.5
+
+def test_incremental_insert():
+    """Templates added later become queryable and duplicates are ignored"""
+    index = MinHashIndex()
+    index.insert("kyc", KYC_TEMPLATE)
+    index.insert("kyc", KYC_TEMPLATE)
+    assert len(index) == 1
+    lottery = "Congratulations! You have won a lottery of Rs 25,00,000. Send your bank details to claim"
+    index.insert("lottery", lottery)
+    assert len(index) == 2
+    assert index.query(lottery.replace("25,00,000", "10,00,000"))[1] == "lottery"
+
+def test_pickle_round_trip():
+    """Snapshots rebuild the same buckets from the signature matrix"""
+    import pickle
+    index = MinHashIndex()
+    index.insert("kyc", KYC_TEMPLATE)
+    index.insert("prize", "You won a prize of Rs 5000, claim now at http://x.tk")
+    restored = pickle.loads(pickle.dumps(index))
+    assert len(restored) == 2
+    assert restored.query(KYC_TEMPLATE) == index.query(KYC_TEMPLATE)
+    restored.insert("kyc", KYC_TEMPLATE)
+    assert len(restored) == 2
+
+def test_empty_index_pickle_round_trip():
+    """An index with no templates survives a snapshot and stays usable"""
+    import pickle
+    restored = pickle.loads(pickle.dumps(MinHashIndex()))
+    assert len(restored) == 0
+    assert restored.query(KYC_TEMPLATE) == (0.0, None)
+    restored.insert("kyc", KYC_TEMPLATE)
+    assert restored.query(KYC_TEMPLATE)[1] == "kyc"
+
+def test_pickle_during_inserts():
+    """Snapshots taken while templates are inserted do not fail"""
+    index = MinHashIndex()
+    for i in range(200):
+        index.insert(f"seed{i}", f"seed template {i} verify your account")
+    stop = threading.Event()
+
+    def insert():
+        i = 0
+        while not stop.is_set():
+            index.insert(f"live{i}", f"urgent message {i} claim your prize")
+            i += 1
+
+    writer = threading.Thread(target=insert)
+    writer.start()
+    try:
+        for _ in range(5):
+            restored = pickle.loads(pickle.dumps(index))
+            assert len(restored) >= 200
+    finally:
+        stop.set()
+        writer.join()
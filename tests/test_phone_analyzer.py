@@ -95,3 +95,10 @@ def test_confidence_range(analyzer):
     for number in test_numbers:
         result = analyzer.analyze("phone", number, "balanced")
         assert 0.0 <= result["confidence"] <= 1.0
+
+def test_degraded_mode_skips_lookup(analyzer):
+    """Degraded analysis uses heuristics only and says so"""
+    result = analyzer.analyze("phone", "+1-900-555-0199", "balanced", degraded=True)
+    assert result["degraded"] is True
+    assert result["used_methods"] == ["heuristic"]
+    assert "load" in " ".join(result["explain"]).lower()
@@ -0,0 +1,65 @@
+import pytest
+from app.analyzers import ScamAnalyzer
+from app.db import init_db
+from app.phone_prefixes import PhonePrefixTable, build_table, prefix_key
+
+@pytest.fixture(scope="module")
+def table(tmp_path_factory):
+    """Prefix table restricted to a few country codes to keep the build fast"""
+    path = str(tmp_path_factory.mktemp("prefixes") / "phone_prefixes.bin")
+    build_table(path, country_codes=[1, 41, 44, 91, 98, 800])
+    return PhonePrefixTable.load(path)
+
+def test_prefix_key_distinguishes_lengths():
+    assert prefix_key("1") != prefix_key("01")
+    assert prefix_key("19") < prefix_key("100")
+
+def test_nanp_premium_and_toll_free(table):
+    assert table.lookup("19005550199")["line_type"] == "premium_rate"
+    assert table.lookup("18005550199")["line_type"] == "toll_free"
+    assert table.lookup("19005550199")["region"] == "US"
+
+def test_shared_country_code_region(table):
+    """Numbers under +1 resolve to the right NANP region"""
+    assert table.lookup("18765551234")["region"] == "JM"
+
+def test_indian_mobile_carrier(table):
+    result = table.lookup("919876543210")
+    assert result["region"] == "IN"
+    assert result["line_type"] == "mobile"
+    assert result["carrier"]
+
+def test_uk_premium(table):
+    assert table.lookup("449098765432")["line_type"] == "premium_rate"
+
+def test_unknown_and_invalid_input(table):
+    assert table.lookup("")["region"] == ""
+    assert table.lookup("notaphone")["line_type"] == ""
+    assert table.lookup("8612345678")["region"] == ""
+
+def test_load_missing_file(tmp_path):
+    assert PhonePrefixTable.load(str(tmp_path / "missing.bin")) is None
+
+def test_load_rejects_corrupt_file(tmp_path):
+    path = tmp_path / "corrupt.bin"
+    path.write_bytes(b"not a prefix table")
+    assert PhonePrefixTable.load(str(path)) is None
+
+@pytest.fixture(scope="module")
+def analyzer(table):
+    init_db()
+    analyzer = ScamAnalyzer()
+    analyzer.prefix_table = table
+    return analyzer
+
+@pytest.mark.parametrize("phone", ["9876543210", "4155551234", "8005551234"])
+def test_unparsed_national_numbers_not_looked_up(analyzer, phone):
+    """Digits without a country code are not read as international numbers"""
+    features = analyzer._extract_phone_features(phone, use_lookup=False)
+    assert features['region'] == ''
+    assert features['line_type'] == ''
+    assert not features['is_toll_free']
+
+def test_unparsed_nanp_premium_fallback(analyzer):
+    assert analyzer._extract_phone_features("9005550199", use_lookup=False)['is_premium']
+    assert analyzer._extract_phone_features("+1-900-555-0199", use_lookup=False)['is_premium']
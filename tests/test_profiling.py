@@ -0,0 +1,32 @@
+import subprocess
+import sys
+from app.profiling import StartupProfile, parse_importtime
+
+def test_profile_report_against_target():
+    profile = StartupProfile(target=1.0)
+    profile.record("import", 0.4)
+    with profile.phase("load_analyzer"):
+        pass
+    report = profile.report()
+    assert set(report["phases_ms"]) == {"import", "load_analyzer"}
+    assert report["within_target"] is True
+    profile.record("import", 0.7)
+    assert profile.report()["within_target"] is False
+
+def test_parse_importtime():
+    output = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       120 |        120 |     app.minhash",
+        "import time:      1500 |      90000 |   app.analyzers",
+    ])
+    rows = parse_importtime(output)
+    assert rows == [("app.minhash", 0.12, 0.12, 2), ("app.analyzers", 1.5, 90.0, 1)]
+
+def test_cold_start_defers_optional_modules():
+    """Training, upload and streaming code load on first use only"""
+    code = (
+        "import sys, app.main; "
+        "print(','.join(m for m in ('sklearn', 'app.train', 'app.files', 'app.streaming') if m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == ""
@@ -0,0 +1,99 @@
+import os
+import uuid
+import psycopg2
+import pytest
+import app.db as db
+from app.db import init_db, add_to_blacklist, check_blacklist, get_db_connection, primary_reads
+from app.replicas import ReplicaSet
+
+# Second, independent Postgres instance acting as a replica that never
+# receives the primary's writes, e.g. postgresql://postgres:@/postgres?host=/tmp/pgdata2
+TEST_REPLICA_URL = os.getenv('TEST_REPLICA_URL')
+
+UNREACHABLE_URL = "postgresql://postgres:@/postgres?host=/nonexistent&connect_timeout=1"
+
+@pytest.fixture
+def blacklisted():
+    """A unique blacklist entry on the primary, removed afterwards"""
+    init_db()
+    value = f"replica-test-{uuid.uuid4().hex}"
+    add_to_blacklist('url', value, 0.9)
+    yield value
+    with get_db_connection() as conn:
+        conn.cursor().execute("DELETE FROM blacklist WHERE value = %s", (value,))
+
+def use_replicas(monkeypatch, urls, **kwargs) -> ReplicaSet:
+    replica_set = ReplicaSet(urls, **kwargs)
+    monkeypatch.setattr(db, "replicas", replica_set)
+    return replica_set
+
+def test_reads_use_primary_without_replicas(monkeypatch, blacklisted):
+    replica_set = use_replicas(monkeypatch, [])
+    assert check_blacklist('url', blacklisted)['trust_score'] == pytest.approx(0.9)
+    assert replica_set.stats()["primary_fallbacks"] == 0
+
+def test_reads_served_by_pooled_replica(monkeypatch, blacklisted):
+    """A replica pointing at the same server answers reads from its pool"""
+    replica_set = use_replicas(monkeypatch, [db.DATABASE_URL])
+    for _ in range(3):
+        assert check_blacklist('url', blacklisted) is not None
+    assert replica_set.stats()["replicas"][0]["reads"] == 3
+    replica_set.close()
+
+def test_unreachable_replica_fails_over_to_primary(monkeypatch, blacklisted):
+    replica_set = use_replicas(monkeypatch, [UNREACHABLE_URL], retry_seconds=60)
+    assert check_blacklist('url', blacklisted) is not None
+    assert check_blacklist('url', blacklisted) is not None
+    stats = replica_set.stats()
+    assert stats["replicas"][0]["healthy"] is False
+    # Skipped during the retry window instead of probed on every read
+    assert stats["replicas"][0]["failures"] == 1
+    assert stats["primary_fallbacks"] == 2
+
+def test_failed_replica_recovers_after_health_check(monkeypatch, blacklisted):
+    replica_set = use_replicas(monkeypatch, [db.DATABASE_URL], retry_seconds=0)
+    replica_set.replicas[0].mark_failed(0)
+    assert check_blacklist('url', blacklisted) is not None
+    assert replica_set.stats()["replicas"][0]["healthy"] is True
+    assert replica_set.stats()["replicas"][0]["reads"] == 1
+    replica_set.close()
+
+def test_query_errors_are_not_failed_over(monkeypatch):
+    """SQL errors surface instead of marking the replica down"""
+    replica_set = use_replicas(monkeypatch, [db.DATABASE_URL])
+    with pytest.raises(psycopg2.ProgrammingError):
+        db.run_read(lambda conn: conn.cursor().execute("SELECT * FROM missing_table"))
+    assert replica_set.stats()["replicas"][0]["healthy"] is True
+    replica_set.close()
+
+@pytest.mark.skipif(not TEST_REPLICA_URL, reason="TEST_REPLICA_URL not set")
+def test_writes_stay_on_primary_with_read_your_writes(monkeypatch, blacklisted):
+    """Reads go to the second instance unless primary_reads() is active"""
+    with psycopg2.connect(TEST_REPLICA_URL) as conn:
+        db._migrate_baseline(conn.cursor())
+    use_replicas(monkeypatch, [TEST_REPLICA_URL])
+
+    assert check_blacklist('url', blacklisted) is None
+    with primary_reads():
+        assert check_blacklist('url', blacklisted) is not None
+    db.replicas.close()
+
+def test_shutdown_closes_replicas_when_snapshot_fails(monkeypatch, tmp_path):
+    """A failing warm-state save does not leave replica pools open"""
+    import asyncio
+    from app import main
+    from app.analyzers import ScamAnalyzer
+    init_db()
+    analyzer = ScamAnalyzer()
+    analyzer.velocity.snapshot_path = str(tmp_path / "velocity.npz")
+    def save_warm():
+        raise OSError("disk full")
+    monkeypatch.setattr(analyzer, "save_warm", save_warm)
+    monkeypatch.setattr(main, "analyzer", analyzer)
+    replica_set = ReplicaSet([])
+    closed = []
+    monkeypatch.setattr(replica_set, "close", lambda: closed.append(True))
+    monkeypatch.setattr(main, "replicas", replica_set)
+    with pytest.raises(OSError):
+        asyncio.run(main.shutdown_event())
+    assert closed == [True]
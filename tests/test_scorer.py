@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+from app.scorer import LinearScorer, ModelBundle, TYPE_FEATURES, features_to_vector
+
+sklearn = pytest.importorskip("sklearn.linear_model")
+
+PHONE_FEATURES = TYPE_FEATURES['phone']
+
+@pytest.fixture(scope="module")
+def fitted_model():
+    """Fit a small logistic regression on random data"""
+    rng = np.random.default_rng(42)
+    X = rng.normal(size=(200, len(PHONE_FEATURES)))
+    y = (X[:, 1] + X[:, 3] > 0).astype(int)
+    return sklearn.LogisticRegression(max_iter=1000).fit(X, y), X
+
+def _bundle(model) -> ModelBundle:
+    scorer = LinearScorer(model.coef_[0], model.intercept_[0], PHONE_FEATURES)
+    return ModelBundle({'phone': scorer}, '20260101T000000Z', {'phone': 0.9})
+
+def test_matches_sklearn_probabilities(fitted_model, tmp_path):
+    """A saved bundle reproduces predict_proba"""
+    model, X = fitted_model
+    path = str(tmp_path / "bundle.npz")
+    _bundle(model).save(path)
+    scorer = ModelBundle.load(path).scorers['phone']
+
+    features_list = [dict(zip(PHONE_FEATURES, row)) for row in X[:20]]
+    expected = model.predict_proba(X[:20])[:, 1]
+
+    assert np.allclose(scorer.predict_proba_batch(features_list), expected)
+    assert scorer.predict_proba(features_list[0]) == pytest.approx(expected[0])
+
+def test_missing_features_default_to_zero():
+    """Features absent from the dict are scored as zero"""
+    vector = features_to_vector({'length': 10, 'in_blacklist': True}, PHONE_FEATURES)
+    assert vector[0] == 10.0
+    assert vector[1] == 1.0
+    assert vector[2:].sum() == 0.0
+
+def test_load_missing_artifact(tmp_path):
+    """Loading a missing artifact returns None"""
+    assert ModelBundle.load(str(tmp_path / "missing.npz")) is None
+
+def test_bundle_round_trip(fitted_model, tmp_path):
+    """Per-type scorers, version and metrics survive save/load"""
+    model, X = fitted_model
+    bundle = _bundle(model)
+    path = str(tmp_path / "bundle.npz")
+    bundle.save(path)
+
+    loaded = ModelBundle.load(path)
+    assert loaded.model_version == '20260101T000000Z'
+    assert loaded.metrics == {'phone': pytest.approx(0.9)}
+    assert 'phone' in loaded and 'sms' not in loaded
+    features = dict(zip(PHONE_FEATURES, X[0]))
+    assert loaded.predict_proba('phone', features) == pytest.approx(bundle.predict_proba('phone', features))
+    assert loaded.predict_proba('sms', features) is None
+
+def test_unversioned_artifact_rejected(fitted_model, tmp_path):
+    """Artifacts without the current layout version are not loaded"""
+    model, _ = fitted_model
+    path = str(tmp_path / "legacy.npz")
+    np.savez(path, coef=model.coef_[0], intercept=np.array(model.intercept_[0]),
+             feature_names=np.array(PHONE_FEATURES))
+    assert ModelBundle.load(path) is None
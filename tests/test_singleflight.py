@@ -0,0 +1,80 @@
+import asyncio
+from app.singleflight import SingleFlight
+
+def test_concurrent_duplicates_share_one_execution():
+    """Identical concurrent calls run once and share the result"""
+    flight = SingleFlight()
+    executions = 0
+
+    async def compute():
+        nonlocal executions
+        executions += 1
+        await asyncio.sleep(0.01)
+        return {"label": "scam"}
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do(("url", "http://x.in", "balanced"), compute) for _ in range(50)))
+
+    results = asyncio.run(scenario())
+    assert executions == 1
+    assert all(result == {"label": "scam"} for result, _ in results)
+    assert sum(shared for _, shared in results) == 49
+    assert flight.stats() == {"calls": 50, "executed": 1, "coalesced": 49, "in_flight": 0}
+
+def test_distinct_keys_and_sequential_calls_are_not_merged():
+    """Different keys, or calls after completion, execute separately"""
+    flight = SingleFlight()
+
+    async def compute():
+        await asyncio.sleep(0)
+        return 1
+
+    async def scenario():
+        await asyncio.gather(flight.do("a", compute), flight.do("b", compute))
+        await flight.do("a", compute)
+
+    asyncio.run(scenario())
+    assert flight.executed == 3
+    assert flight.coalesced == 0
+
+def test_exception_propagates_to_followers():
+    """Followers receive the leader's exception"""
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def scenario():
+        return await asyncio.gather(flight.do("k", fail), flight.do("k", fail), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert flight.stats()["in_flight"] == 0
+
+def test_cancelled_leader_hands_over_to_follower():
+    """Followers are not cancelled with the leader, one of them re-runs the work"""
+    flight = SingleFlight()
+    executions = 0
+
+    async def compute():
+        nonlocal executions
+        executions += 1
+        await asyncio.sleep(0.02)
+        return executions
+
+    async def scenario():
+        leader = asyncio.create_task(flight.do("k", compute))
+        await asyncio.sleep(0)
+        followers = [asyncio.create_task(flight.do("k", compute)) for _ in range(3)]
+        await asyncio.sleep(0.005)
+        leader.cancel()
+        results = await asyncio.gather(*followers)
+        return leader, results
+
+    leader, results = asyncio.run(scenario())
+    assert leader.cancelled()
+    assert executions == 2
+    assert sorted(shared for _, shared in results) == [False, True, True]
+    assert all(result == 2 for result, _ in results)
+    assert flight.stats() == {"calls": 4, "executed": 2, "coalesced": 2, "in_flight": 0}
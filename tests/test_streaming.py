@@ -0,0 +1,74 @@
+import pytest
+from app.analyzers import ScamAnalyzer
+from app.db import init_db
+from app.minhash import normalize_sms
+from app.streaming import StreamSession, TAIL_CHARS
+
+TRANSCRIPT = (
+    "Hello sir, this is calling from your bank. Your account is suspended and "
+    "you must verify account immediately. You have won a cash prize, claim it now "
+    "at www.bank-verify.in or call +919812345678 urgent"
+)
+
+@pytest.fixture(scope="module")
+def analyzer():
+    init_db()
+    return ScamAnalyzer()
+
+def _chunks(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+TEMPLATE = "Dear customer your KYC is pending, update at http://kyc-upd.in/x9 or pay Rs. 1,250 within 24 hours"
+VARIANT = "Dear customer your KYC is pending, update at https://kyc-renew.co/a1 or pay Rs 9,999 within 12 hours"
+
+@pytest.fixture(scope="module")
+def template_analyzer(analyzer):
+    analyzer.sms_index.insert(normalize_sms(TEMPLATE), TEMPLATE)
+    return analyzer
+
+@pytest.mark.parametrize("size", [1, 7, 20, 50, len(TRANSCRIPT)])
+def test_incremental_features_match_full_text(template_analyzer, size):
+    """Chunked scoring sees the same keywords, URL, phone and template as the whole text"""
+    analyzer = template_analyzer
+    session = StreamSession(analyzer)
+    for chunk in _chunks(TRANSCRIPT, size):
+        session.feed(chunk)
+
+    expected = analyzer._extract_sms_features(TRANSCRIPT)
+    features = session.features()
+    for key in ('length', 'has_url', 'has_phone', 'urgency_words', 'money_words',
+                'has_suspicious_keywords', 'template_similarity'):
+        assert features[key] == expected[key], key
+
+@pytest.mark.parametrize("size", [1, 3, 7, 20, 50, len(VARIANT)])
+def test_incremental_template_similarity(template_analyzer, size):
+    """URLs and amounts split across chunks are masked before shingling"""
+    session = StreamSession(template_analyzer)
+    for chunk in _chunks(VARIANT, size):
+        session.feed(chunk)
+    expected = template_analyzer._extract_sms_features(VARIANT)['template_similarity']
+    assert expected > 0.5
+    assert session.features()['template_similarity'] == expected
+
+def test_short_text_similarity(template_analyzer):
+    session = StreamSession(template_analyzer)
+    session.feed("Rs")
+    session.feed(" 50")
+    assert session.features()['template_similarity'] == \
+        template_analyzer._extract_sms_features("Rs 50")['template_similarity']
+
+def test_verdict_updates_per_chunk(analyzer):
+    """Each chunk returns a verdict and memory stays bounded"""
+    session = StreamSession(analyzer)
+    first = session.feed("Hi, how are you doing today? ")
+    for chunk in _chunks(TRANSCRIPT, 20):
+        last = session.feed(chunk)
+    assert first["chunks"] == 1
+    assert last["confidence"] > first["confidence"]
+    assert last["label"] in ["scam", "likely_scam"]
+    assert len(session.tail) <= TAIL_CHARS
+
+def test_oversized_chunk_rejected(analyzer):
+    session = StreamSession(analyzer)
+    with pytest.raises(ValueError):
+        session.feed("x" * 10000)
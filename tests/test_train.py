@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("sklearn")
+
+from app.train import PARAM_GRID, DEFAULT_PARAMS, search_hyperparameters, train_type_models, to_scorer, _new_model, _pool_context
+from app.scorer import TYPE_FEATURES
+
+def make_dataset(input_type, rows=60, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(rows, len(TYPE_FEATURES[input_type])))
+    X[:, 0] *= 100  # unscaled column like raw length
+    y = (X[:, 1] + X[:, 2] > 0).astype(int)
+    return X, y
+
+def test_search_runs_in_parallel_and_picks_grid_params():
+    """Process pool search returns one grid candidate and score per type"""
+    datasets = {'phone': make_dataset('phone'), 'sms': make_dataset('sms', seed=1)}
+    best = search_hyperparameters(datasets, workers=2)
+    assert set(best) == {'phone', 'sms'}
+    for params, score in best.values():
+        assert params in PARAM_GRID
+        assert 0.5 < score <= 1.0
+
+def test_search_without_enough_rows_uses_defaults():
+    """A class with a single row cannot be cross-validated"""
+    X = np.zeros((5, len(TYPE_FEATURES['file'])))
+    y = np.array([1, 0, 0, 0, 0])
+    params, score = search_hyperparameters({'file': (X, y)}, workers=1)['file']
+    assert params == DEFAULT_PARAMS
+    assert np.isnan(score)
+
+def test_exported_scorer_matches_pipeline():
+    """Folding the scaler into the weights reproduces the pipeline"""
+    X, y = make_dataset('url')
+    model = _new_model({'C': 1.0, 'class_weight': None}).fit(X, y)
+    scorer = to_scorer(model, TYPE_FEATURES['url'])
+    features_list = [dict(zip(TYPE_FEATURES['url'], row)) for row in X[:10]]
+    assert np.allclose(scorer.predict_proba_batch(features_list), model.predict_proba(X[:10])[:, 1])
+
+def test_single_class_types_get_no_model():
+    """Types without both labels fall back to heuristics"""
+    X, y = make_dataset('phone')
+    bundle, models = train_type_models({'phone': (X, y), 'file': (X[:, :7], np.zeros(len(y), dtype=int))}, workers=1)
+    assert 'phone' in bundle and 'file' not in bundle
+    assert set(models) == {'phone'}
+    assert bundle.model_version
+
+def test_search_workers_do_not_fork():
+    """The pool does not fork the (multi-threaded) server process"""
+    assert _pool_context().get_start_method() != 'fork'
@@ -0,0 +1,72 @@
+import os
+import threading
+import time
+from app.indicators import normalize_indicator
+from app.velocity import VelocityTracker, SNAPSHOT_INTERVAL
+
+def test_counts_within_window():
+    """Repeated lookups accumulate within the hour"""
+    tracker = VelocityTracker(width=1024)
+    for i in range(5):
+        count = tracker.record("url:scam.in", now=1000 + i * 60)
+    assert count == 5
+    assert tracker.estimate("url:other.in", now=1300) == 0
+
+def test_old_buckets_expire():
+    """Lookups older than the window no longer count"""
+    tracker = VelocityTracker(width=1024, bucket_seconds=300, num_buckets=12)
+    tracker.record("phone:9000000000", now=0)
+    tracker.record("phone:9000000000", now=1800)
+    assert tracker.estimate("phone:9000000000", now=3700) == 1
+    assert tracker.estimate("phone:9000000000", now=5500) == 0
+
+def test_memory_is_fixed():
+    """Sketch size does not grow with distinct keys"""
+    tracker = VelocityTracker(width=256, depth=2)
+    nbytes = tracker.counts.nbytes
+    for i in range(5000):
+        tracker.record(f"url:site{i}.com", now=100)
+    assert tracker.counts.nbytes == nbytes
+    # Count-min never undercounts
+    assert tracker.estimate("url:site1.com", now=100) >= 1
+
+def test_snapshot_round_trip(tmp_path):
+    """Counts survive a save and reload"""
+    path = str(tmp_path / "velocity.npz")
+    tracker = VelocityTracker(snapshot_path=path)
+    tracker.record("sms:win a prize", now=1000)
+    tracker.record("sms:win a prize", now=1010)
+    tracker.save()
+    restored = VelocityTracker.load(path)
+    assert restored.estimate("sms:win a prize", now=1020) == 2
+
+def test_due_snapshot_written_once(tmp_path, monkeypatch):
+    """Concurrent lookups past the interval trigger a single snapshot"""
+    path = str(tmp_path / "velocity.npz")
+    tracker = VelocityTracker(snapshot_path=path)
+    saves = []
+    monkeypatch.setattr(tracker, 'save', lambda: saves.append(1) or time.sleep(0.05))
+    now = time.time() + SNAPSHOT_INTERVAL + 1
+    threads = [threading.Thread(target=tracker.record, args=("url:scam.in", now)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(saves) == 1
+
+def test_concurrent_saves_do_not_collide(tmp_path):
+    path = str(tmp_path / "velocity.npz")
+    tracker = VelocityTracker(snapshot_path=path)
+    tracker.record("sms:win a prize", now=1000)
+    threads = [threading.Thread(target=tracker.save) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert VelocityTracker.load(path).estimate("sms:win a prize", now=1000) == 1
+    assert os.listdir(tmp_path) == ["velocity.npz"]
+
+def test_normalize_indicator():
+    """Formatting variants share a key"""
+    assert normalize_indicator("phone", "+91-90000 00000") == normalize_indicator("phone", "919000000000")
+    assert normalize_indicator("url", "HTTPS://www.Scam.in/") == "scam.in"
@@ -0,0 +1,45 @@
+import pytest
+from app.analyzers import ScamAnalyzer
+from app.db import init_db, add_training_data, get_db_connection
+from app.domains import PROTECTED_BRANDS
+
+@pytest.fixture(scope="module")
+def analyzer():
+    init_db()
+    return ScamAnalyzer()
+
+def test_warm_state_round_trip(analyzer, tmp_path):
+    """A fresh snapshot restores the indexes without rebuilding"""
+    path = str(tmp_path / "warm_state.pkl")
+    analyzer.save_warm(path)
+    restored = ScamAnalyzer.load_warm(path)
+    assert restored.warm is True
+    assert len(restored.sms_index) == len(analyzer.sms_index)
+    assert restored.brand_index.match("http://sbi-kyc-update.tk")["brand"] == "sbi"
+
+def test_stale_warm_state_is_rebuilt(analyzer, tmp_path):
+    """New SMS training rows invalidate the snapshot"""
+    path = str(tmp_path / "warm_state.pkl")
+    analyzer.save_warm(path)
+    add_training_data("sms", "warm state test message", "benign", {})
+    try:
+        assert ScamAnalyzer.load_warm(path).warm is False
+    finally:
+        with get_db_connection() as conn:
+            conn.cursor().execute("DELETE FROM training_data WHERE input_raw = 'warm state test message'")
+
+def test_missing_or_corrupt_warm_state(tmp_path):
+    init_db()
+    assert ScamAnalyzer.load_warm(str(tmp_path / "missing.pkl")).warm is False
+    corrupt = tmp_path / "corrupt.pkl"
+    corrupt.write_bytes(b"not a pickle")
+    assert ScamAnalyzer.load_warm(str(corrupt)).warm is False
+
+def test_brand_list_not_snapshotted(analyzer, tmp_path, monkeypatch):
+    """Brand list changes apply even when the warm state is reused"""
+    path = str(tmp_path / "warm_state.pkl")
+    analyzer.save_warm(path)
+    monkeypatch.setitem(PROTECTED_BRANDS, "examplebank", ["examplebank.in"])
+    restored = ScamAnalyzer.load_warm(path)
+    assert restored.warm is True
+    assert restored.brand_index.match("http://examplebank-kyc.tk")["brand"] == "examplebank"